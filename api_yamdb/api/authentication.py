@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.versions import get_versions, object_version_keys
+
+User = get_user_model()
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def partial_user(pk, **fields):
+    """Несохранённый CustomUser только с полями ``CLAIM_FIELDS``: их
+    достаточно для проверки прав и указания автора. Полную модель
+    возвращает ``get_full_user``."""
+    user = User(pk=pk, **fields)
+    user.is_partial = True
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с кэшированием пользователя.
+
+    В кэше ``AUTH_USER_CACHE_TIMEOUT`` секунд хранятся только id и поля
+    ``CLAIM_FIELDS`` (без хеша пароля и личных данных) под ключом с
+    версией данных этого пользователя. Любое сохранение или удаление
+    CustomUser (через API, админку или ORM) увеличивает версию, поэтому
+    смена роли или блокировка действуют со следующего запроса.
+    """
+
+    def get_user(self, validated_token):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not timeout or user_id is None:
+            return super().get_user(validated_token)
+        versions = get_versions(
+            *object_version_keys(self.user_model, user_id)
+        )
+        key = 'auth-user:{}:{}'.format(
+            user_id, ':'.join(map(str, versions))
+        )
+        fields = cache.get(key)
+        if fields is not None:
+            return partial_user(user_id, **fields)
+        user = super().get_user(validated_token)
+        cache.set(
+            key,
+            {name: getattr(user, name) for name in User.CLAIM_FIELDS},
+            timeout
+        )
+        return user
+
+
+def access_token_for(user):
+    """Access-токен пользователя; в режиме ``JWT_ROLE_CLAIMS`` в него
+    добавляются роль, флаги и версия токенов пользователя."""
+    token = RefreshToken.for_user(user).access_token
+    if settings.JWT_ROLE_CLAIMS:
+        for name in User.CLAIM_FIELDS:
+            token[name] = getattr(user, name)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+def current_token_version(user_id):
+    """Действующая версия токенов пользователя или None, если
+    пользователь удалён или заблокирован.
+
+    Значение кэшируется с версией данных пользователя на
+    ``JWT_TOKEN_VERSION_CACHE_TIMEOUT`` секунд: с общим кэшем отзыв
+    действует сразу, а с кэшем в памяти каждого процесса — не позже чем
+    через это время.
+    """
+    timeout = settings.JWT_TOKEN_VERSION_CACHE_TIMEOUT
+    key = None
+    if timeout:
+        versions = get_versions(*object_version_keys(User, user_id))
+        key = 'token-version:{}:{}'.format(
+            user_id, ':'.join(map(str, versions))
+        )
+        token_version = cache.get(key)
+        if token_version is not None:
+            return None if token_version < 0 else token_version
+    token_version = User.objects.filter(
+        pk=user_id, is_active=True
+    ).values_list('token_version', flat=True).first()
+    if key is not None:
+        cache.set(key, -1 if token_version is None else token_version, timeout)
+    return token_version
+
+
+def get_full_user(user):
+    """Полная модель пользователя для пользователя из кэша или токена
+    (см. ``partial_user``)."""
+    if getattr(user, 'is_partial', False):
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """Аутентификация без обращения к БД по токенам с ролью.
+
+    Если токен выпущен в режиме ``JWT_ROLE_CLAIMS``, пользователь
+    собирается из его полей (``partial_user``). Полная модель
+    загружается через ``get_full_user`` там, где нужны остальные поля
+    (профиль ``users/me``). Токен принимается,
+    только если его версия совпадает с текущей версией токенов
+    пользователя: смена роли, флагов или блокировка увеличивают её.
+    Остальные токены обрабатываются как в ``CachedJWTAuthentication``.
+    """
+
+    def get_user(self, validated_token):
+        if (not settings.JWT_ROLE_CLAIMS
+                or TOKEN_VERSION_CLAIM not in validated_token):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит идентификатора пользователя')
+        token_version = current_token_version(user_id)
+        if token_version != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked'
+            )
+        return partial_user(
+            user_id,
+            **{name: validated_token[name] for name in User.CLAIM_FIELDS},
+            token_version=token_version
+        )
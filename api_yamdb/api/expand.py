@@ -0,0 +1,153 @@
+"""Встраивание отзывов и комментариев в ответ произведения.
+
+``GET titles/{id}/?expand=reviews,reviews.comments`` возвращает
+произведение вместе с последними отзывами, а для каждого отзыва — с его
+последними комментариями. Количество запросов не зависит от числа
+отзывов: один запрос загружает отзывы, ещё один — комментарии всех
+отзывов сразу, причём ограничение ``comments_limit`` на каждый отзыв
+применяется в БД коррелированным подзапросом.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from reviews.models import Comment, Review
+from reviews.versions import BULK_SUFFIX, version_key
+
+from .serializers import CommentSerializer, ReviewSerializer
+
+User = get_user_model()
+
+EXPAND_REVIEWS = 'reviews'
+EXPAND_COMMENTS = 'reviews.comments'
+
+
+def latest_reviews(title, limit):
+    reviews = list(
+        Review.objects.filter(title=title)
+        .select_related('author')
+        .only('id', 'title_id', 'text', 'score', 'pub_date',
+              'author__username')
+        .order_by('-pub_date', '-pk')[:limit]
+    )
+    for review in reviews:
+        # Произведение уже загружено, отдельный запрос для поля title
+        # сериализатора не нужен.
+        review.title = title
+    return reviews
+
+
+def latest_comments(review_ids, limit):
+    """Не более ``limit`` последних комментариев каждого отзыва одним
+    запросом; словарь id отзыва -> список комментариев."""
+    latest = Comment.objects.filter(
+        review_id=OuterRef('review_id')
+    ).order_by('-pub_date', '-pk').values('pk')[:limit]
+    comments = (
+        Comment.objects.filter(review_id__in=review_ids,
+                               pk__in=Subquery(latest))
+        .select_related('author')
+        .only('id', 'review_id', 'text', 'pub_date', 'author__username')
+        .order_by('review_id', '-pub_date', '-pk')
+    )
+    by_review = {review_id: [] for review_id in review_ids}
+    for comment in comments:
+        by_review[comment.review_id].append(comment)
+    return by_review
+
+
+class ExpandReviewsMixin:
+    """``?expand=`` для retrieve произведения.
+
+    Подключается перед ``ConditionalGetMixin``: ETag ответа со встроенными
+    данными зависит и от версий отзывов, комментариев и пользователей.
+
+    Количество отзывов задаётся параметром ``reviews_limit``, комментариев
+    к каждому отзыву — ``comments_limit`` (не больше ``max_expand_limit``).
+    """
+
+    expand_param = 'expand'
+    reviews_limit = 10
+    comments_limit = 3
+    max_expand_limit = 100
+
+    def get_expand(self):
+        if hasattr(self, '_expand'):
+            return self._expand
+        self._expand = set()
+        value = self.request.query_params.get(self.expand_param)
+        if (value is None or self.action != 'retrieve'
+                or self.request.method not in SAFE_METHODS):
+            return self._expand
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = sorted(names - {EXPAND_REVIEWS, EXPAND_COMMENTS})
+        if unknown:
+            raise ValidationError({self.expand_param: [
+                f'Неизвестные связи: {", ".join(unknown)}'
+            ]})
+        if EXPAND_COMMENTS in names:
+            names.add(EXPAND_REVIEWS)
+        self._expand = names
+        return names
+
+    def get_expand_limit(self, param, default):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return default
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_expand_limit:
+            raise ValidationError({param: [
+                f'Ожидается целое число от 1 до {self.max_expand_limit}'
+            ]})
+        return limit
+
+    def get_version_keys(self):
+        keys = super().get_version_keys()
+        expand = self.get_expand()
+        if not expand:
+            return keys
+        # Изменение отзыва увеличивает версию его произведения, поэтому
+        # для отзывов достаточно ключа массовых изменений.
+        keys += [version_key(Review, BULK_SUFFIX), version_key(User)]
+        if EXPAND_COMMENTS in expand:
+            keys.append(version_key(Comment))
+        return keys
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.get_expand():
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional(
+            request, lambda: self.retrieve_expanded(request)
+        )
+
+    def retrieve_expanded(self, request):
+        expand = self.get_expand()
+        reviews_limit = self.get_expand_limit(
+            'reviews_limit', self.reviews_limit
+        )
+        comments_limit = self.get_expand_limit(
+            'comments_limit', self.comments_limit
+        )
+        title = self.get_object()
+        data = dict(self.get_serializer(title).data)
+        reviews = latest_reviews(title, reviews_limit)
+        # Вложенные сериализаторы получают контекст без sparse_fields:
+        # ?fields= относится только к полям произведения.
+        context = {'request': request}
+        data[EXPAND_REVIEWS] = ReviewSerializer(
+            reviews, many=True, context=context
+        ).data
+        if EXPAND_COMMENTS in expand:
+            comments = latest_comments(
+                [review.pk for review in reviews], comments_limit
+            )
+            for review, item in zip(reviews, data[EXPAND_REVIEWS]):
+                item['comments'] = CommentSerializer(
+                    comments[review.pk], many=True, context=context
+                ).data
+        return Response(data)
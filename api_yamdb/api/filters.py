@@ -1,23 +1,110 @@
+from django.db.models import F
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
 
-from reviews.models import Title
+from reviews.catalog import find_by_slugs
+from reviews.models import Category, Genre, Title
+from reviews.search import TooManyResults, search_queryset
+
+
+def search_or_400(queryset, text, param):
+    """``search_queryset`` с ошибкой 400, если запрос слишком общий."""
+    try:
+        return search_queryset(queryset, text)
+    except TooManyResults as error:
+        raise ValidationError({param: [str(error)]})
+
+
+class FullTextSearchFilter(SearchFilter):
+    """Параметр ``?search=`` через полнотекстовый индекс.
+
+    Результаты упорядочены по релевантности.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_or_400(
+            queryset, ' '.join(terms), self.search_param
+        )
+
+
+def slugs_to_ids(model, value):
+    """Переводит список slug через запятую в id по кэшу справочника."""
+    slugs = [slug.strip() for slug in value.split(',')]
+    return [obj.pk for obj in find_by_slugs(model, slugs)]
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """Сортировка с первичным ключом в конце для устойчивого порядка.
+
+    Пустые значения (рейтинг произведения без отзывов) идут в конце при
+    любом направлении сортировки: по умолчанию SQLite ставит NULL в начало
+    по возрастанию, а PostgreSQL — по убыванию.
+    """
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ordering = [
+            self.nulls_last(qs.model, self.get_ordering_value(param))
+            for param in value
+        ]
+        return qs.order_by(*ordering, 'pk')
+
+    @staticmethod
+    def nulls_last(model, ordering):
+        name = ordering.lstrip('-')
+        if not model._meta.get_field(name).null:
+            return ordering
+        if ordering.startswith('-'):
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_last=True)
 
 
 class TitleFilter(filters.FilterSet):
+    """Фильтры произведений.
 
-    category = filters.CharFilter(
+    ``category`` и ``genre`` принимают точные slug (несколько — через
+    запятую) и фильтруют по индексированным внешним ключам. Поиск по
+    части slug доступен явно через ``category__icontains`` и
+    ``genre__icontains``. Диапазоны года и рейтинга и сортировка
+    ``ordering`` работают по индексированным колонкам Title; рейтинг
+    хранится в модели, поэтому агрегация и HAVING не нужны.
+    """
+
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    category__icontains = filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains'
     )
-    genre = filters.CharFilter(
+    genre__icontains = filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains'
-    )
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains'
+        lookup_expr='icontains',
+        distinct=True
     )
+    name = filters.CharFilter(method='filter_name')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    ordering = StableOrderingFilter(fields=('rating', 'year', 'name'))
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category_id__in=slugs_to_ids(Category, value))
+
+    def filter_genre(self, queryset, name, value):
+        links = Title.genre.through.objects.filter(
+            genre_id__in=slugs_to_ids(Genre, value)
+        )
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_name(self, queryset, name, value):
+        return search_or_400(queryset, value, name)
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.values_serializers import ValuesSerializer
+
+from .explain_queries import Command as ExplainQueriesCommand
+
+
+class Command(BaseCommand):
+    """Сравнение обычной и быстрой сериализации списков API."""
+
+    help = (
+        'Измеряет время сериализации списков API через ModelSerializer '
+        'и через ValuesSerializer на данных текущей базы и проверяет, что '
+        'ответы совпадают.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Количество строк в каждом списке.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов каждого измерения.'
+        )
+
+    @staticmethod
+    def measure(callback, repeat):
+        """Лучшее время выполнения ``callback`` и его результат."""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = callback()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        limit, repeat = options['limit'], options['repeat']
+        renderer = JSONRenderer()
+        for name, viewset, kwargs, url in ExplainQueriesCommand().get_cases():
+            view = ExplainQueriesCommand.build_view(viewset, kwargs, url)
+            queryset = view.filter_queryset(view.get_queryset())
+            serializer_class = view.get_serializer_class()
+            context = view.get_serializer_context()
+
+            def classic():
+                return serializer_class(
+                    queryset[:limit], many=True, context=context
+                ).data
+
+            def fast():
+                engine = ValuesSerializer(serializer_class, context)
+                return engine.serialize(engine.values(queryset)[:limit])
+
+            classic_time, expected = self.measure(classic, repeat)
+            fast_time, actual = self.measure(fast, repeat)
+            if renderer.render(actual) != renderer.render(expected):
+                raise CommandError(
+                    f'{name}: ответы ModelSerializer и ValuesSerializer '
+                    f'различаются.'
+                )
+            speedup = classic_time / fast_time if fast_time else 0
+            self.stdout.write(
+                f'{name}: {len(expected)} строк, ModelSerializer '
+                f'{classic_time * 1000:.2f} мс, ValuesSerializer '
+                f'{fast_time * 1000:.2f} мс, ускорение {speedup:.1f}×'
+            )
@@ -0,0 +1,106 @@
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+                       ReviewViewSet, TitleViewSet)
+from reviews.models import Review, Title
+
+# Строки плана, означающие полный просмотр таблицы или сортировку без
+# индекса: SQLite (SCAN без USING INDEX, TEMP B-TREE) и PostgreSQL.
+FULL_SCAN_PATTERNS = (
+    re.compile(r'\bSCAN (TABLE )?\w+$'),
+    re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+    re.compile(r'Seq Scan on'),
+)
+
+
+class Command(BaseCommand):
+    """EXPLAIN для запросов списков API."""
+
+    help = (
+        'Выполняет EXPLAIN для запросов, которыми API формирует списки, '
+        'и сообщает о полных просмотрах таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Завершиться с ошибкой, если найден полный просмотр.'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Выводить планы запросов целиком.'
+        )
+
+    def get_cases(self):
+        title_id = Title.objects.values_list('pk', flat=True).first()
+        review = Review.objects.values('pk', 'title_id').first()
+        cases = [
+            ('titles', TitleViewSet, {}, '/api/v1/titles/'),
+            ('titles?year', TitleViewSet, {}, '/api/v1/titles/?year=2000'),
+            ('titles?genre', TitleViewSet, {}, '/api/v1/titles/?genre=drama'),
+            (
+                'titles?rating', TitleViewSet, {},
+                '/api/v1/titles/?rating_min=7&ordering=-rating'
+            ),
+            ('categories', CategoryViewSet, {}, '/api/v1/categories/'),
+            ('genres', GenreViewSet, {}, '/api/v1/genres/'),
+        ]
+        if title_id is not None:
+            cases.append((
+                'reviews', ReviewViewSet, {'title_id': title_id},
+                f'/api/v1/titles/{title_id}/reviews/'
+            ))
+        if review is not None:
+            kwargs = {
+                'title_id': review['title_id'], 'review_id': review['pk']
+            }
+            cases.append((
+                'comments', CommentViewSet, kwargs,
+                '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+                .format(**kwargs)
+            ))
+        return cases
+
+    @staticmethod
+    def build_view(viewset, kwargs, url):
+        """Представление списка, подготовленное для запроса ``url``."""
+        view = viewset(
+            action_map={'get': 'list'}, kwargs=kwargs, format_kwarg=None
+        )
+        view.request = view.initialize_request(APIRequestFactory().get(url))
+        return view
+
+    def build_queryset(self, viewset, kwargs, url):
+        view = self.build_view(viewset, kwargs, url)
+        queryset = view.filter_queryset(view.get_queryset())
+        page_size = view.paginator.get_page_size(view.request) or 10
+        return queryset[:page_size]
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'СУБД: {connection.vendor}')
+        problems = 0
+        for name, viewset, kwargs, url in self.get_cases():
+            plan = self.build_queryset(viewset, kwargs, url).explain()
+            scans = [
+                line.strip() for line in plan.splitlines()
+                if any(
+                    pattern.search(line.strip())
+                    for pattern in FULL_SCAN_PATTERNS
+                )
+            ]
+            status = 'ok'
+            if scans:
+                status = 'полный просмотр или сортировка без индекса'
+            self.stdout.write(f'{name}: {status}')
+            for line in (plan.splitlines() if options['verbose_plans']
+                         else scans):
+                self.stdout.write(f'    {line}')
+            problems += bool(scans)
+        if problems and options['fail_on_scan']:
+            raise CommandError(f'Запросов с полным просмотром: {problems}.')
@@ -1,8 +1,246 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import SlugRelatedField
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.versions import get_versions, object_version_keys, version_key
+
+from .pagination import keyset_fields
+
 
 class ModelMixinSet(CreateModelMixin, ListModelMixin,
                     DestroyModelMixin, GenericViewSet):
     pass
+
+
+class ParentObjectMixin:
+    """Родительский объект вложенного ресурса, загружаемый один раз
+    за запрос и переиспользуемый в queryset, сериализаторе и при создании.
+
+    Наследники реализуют ``resolve_parent``.
+    """
+
+    def resolve_parent(self):
+        raise NotImplementedError
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = self.resolve_parent()
+        return self._parent
+
+
+def field_lookups(model, field):
+    """Поля модели (в формате ``only``), нужные полю сериализатора.
+
+    Поле может объявить их само атрибутом ``query_lookups``; None
+    означает, что нужные полю данные неизвестны.
+    """
+    lookups = getattr(field, 'query_lookups', None)
+    if lookups is not None:
+        return list(lookups)
+    if field.source == '*':
+        return None
+    attrs = list(field.source_attrs)
+    # category_id -> category: only() принимает имена полей, а не столбцов.
+    for model_field in model._meta.concrete_fields:
+        if model_field.attname == attrs[0]:
+            attrs[0] = model_field.name
+            break
+    else:
+        return None
+    if isinstance(field, SlugRelatedField):
+        attrs.append(field.slug_field)
+    return ['__'.join(attrs)]
+
+
+class SparseFieldsMixin:
+    """Выборка полей ответа параметрами ``?fields=`` и ``?omit=``.
+
+    Для GET запросов выбранные поля передаются сериализатору в контексте
+    (``sparse_fields``, см. ``SparseFieldsSerializerMixin``), а queryset
+    загружает только нужные столбцы и соединяет только нужные связанные
+    таблицы. Неизвестное поле — ошибка 400.
+    """
+
+    fields_param = 'fields'
+    omit_param = 'omit'
+
+    def parse_field_names(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    def get_sparse_fields(self):
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        self._sparse_fields = None
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        selected = self.parse_field_names(self.fields_param)
+        omitted = self.parse_field_names(self.omit_param)
+        if not selected and not omitted:
+            return None
+        available = self.get_serializer_class()().fields
+        errors = {}
+        for param, names in (
+            (self.fields_param, selected), (self.omit_param, omitted)
+        ):
+            unknown = sorted((names or set()) - set(available))
+            if unknown:
+                errors[param] = [f'Неизвестные поля: {", ".join(unknown)}']
+        if errors:
+            raise ValidationError(errors)
+        self._sparse_fields = (selected or set(available)) - (omitted or set())
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        sparse_fields = self.get_sparse_fields()
+        if sparse_fields is not None:
+            context['sparse_fields'] = sparse_fields
+        return context
+
+    def filter_queryset(self, queryset):
+        # filter_queryset, а не get_queryset: представления переопределяют
+        # get_queryset, а list, retrieve и FastListMixin вызывают оба.
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None:
+            return queryset
+        model = queryset.model
+        lookups = keyset_fields(self)
+        for field in self.get_serializer().fields.values():
+            if field.write_only:
+                continue
+            needed = field_lookups(model, field)
+            if needed is None:
+                return queryset
+            lookups += needed
+        related = {
+            lookup.rsplit('__', 1)[0] for lookup in lookups if '__' in lookup
+        }
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        return queryset.only(*dict.fromkeys(lookups))
+
+
+class ConditionalListMixin:
+    """ETag и Last-Modified для list по версиям данных.
+
+    Валидаторы вычисляются по версиям моделей из ``etag_models`` (для
+    retrieve по первичному ключу версия модели queryset заменяется версиями
+    объекта) ещё до обращения к queryset. Если клиент прислал совпадающий
+    If-None-Match или If-Modified-Since, возвращается 304 без запросов к БД
+    и без сериализации.
+
+    При ``cache_anonymous_responses`` готовые JSON-ответы анонимным
+    пользователям хранятся в кэше под ключом из того же ETag: изменение
+    данных меняет версии и вместе с ними ключ, поэтому устаревший ответ
+    никогда не будет отдан.
+    """
+
+    etag_models = ()
+    cache_anonymous_responses = False
+
+    def get_version_keys(self):
+        model = self.get_queryset_model()
+        models = self.etag_models or (model,)
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if (self.action == 'retrieve' and self.lookup_field == 'pk'
+                and lookup in self.kwargs):
+            keys = object_version_keys(model, self.kwargs[lookup])
+            return keys + [
+                version_key(etag_model) for etag_model in models
+                if etag_model is not model
+            ]
+        return [version_key(etag_model) for etag_model in models]
+
+    def get_queryset_model(self):
+        if getattr(self, 'queryset', None) is not None:
+            return self.queryset.model
+        return self.get_serializer_class().Meta.model
+
+    def get_validators(self, request):
+        keys = self.get_version_keys()
+        versions = get_versions(*keys)
+        digest = hashlib.md5(
+            '|'.join([
+                request.get_full_path(),
+                request.accepted_media_type or '',
+                *keys,
+                *map(str, versions),
+            ]).encode()
+        ).hexdigest()
+        return quote_etag(f'W/"{digest}"'), max(versions) // 1000 + 1
+
+    def conditional(self, request, render):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            cache_key = self.get_response_cache_key(request, etag)
+            cached = cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = render()
+                if response.status_code != 200:
+                    return response
+                self._response_cache_key = cache_key
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_response_cache_key(self, request, etag):
+        if not (
+            self.cache_anonymous_responses
+            and settings.RESPONSE_CACHE_TIMEOUT
+            and not request.user.is_authenticated
+            and request.accepted_renderer.format == 'json'
+        ):
+            return None
+        return f'api-response:{etag}'
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        cache_key = getattr(self, '_response_cache_key', None)
+        if cache_key and response.status_code == 200:
+            response.render()
+            cache.set(
+                cache_key,
+                (response.content, response['Content-Type']),
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(
+            request, lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """То же для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            request, lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
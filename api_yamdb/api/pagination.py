@@ -0,0 +1,192 @@
+import hashlib
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from reviews.versions import model_versions
+
+PAGINATION_MODE_PAGE = 'page'
+PAGINATION_MODE_CURSOR = 'cursor'
+
+
+def estimate_count(queryset):
+    """Оценка количества строк по плану запроса.
+
+    Поддерживается только PostgreSQL; для остальных СУБД возвращает None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт количество объектов из кэша.
+
+    Если количество ещё не закэшировано и оценка планировщика превышает
+    ``PAGINATION_COUNT_ESTIMATE_THRESHOLD``, вместо точного COUNT(*)
+    используется оценка.
+    """
+
+    def __init__(self, object_list, per_page, count_cache_key=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = self.estimate_count()
+            if count is None:
+                count = super().count
+            cache.set(
+                self.count_cache_key,
+                count,
+                settings.PAGINATION_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+    def estimate_count(self):
+        threshold = settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+        if threshold is None:
+            return None
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < threshold:
+            return None
+        return estimate
+
+
+class CachedCountPagination(PageNumberPagination):
+    """Постраничная пагинация с кэшированием общего количества записей.
+
+    Ключ кэша строится по адресу и параметрам фильтрации запроса и
+    включает версии моделей из ``count_cache_models`` представления
+    (по умолчанию — модель queryset), поэтому любая запись в эти модели
+    инвалидирует закэшированное значение.
+    """
+
+    ignored_query_params = ('page', 'page_size', 'pagination', 'cursor')
+
+    def get_count_cache_key(self, queryset, request, view):
+        models = getattr(view, 'count_cache_models', (queryset.model,))
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key not in self.ignored_query_params
+            for value in values
+        )
+        raw_key = json.dumps(
+            [request.path, params, model_versions(*models)],
+            ensure_ascii=False
+        )
+        digest = hashlib.md5(raw_key.encode()).hexdigest()
+        return f'pagination-count:{digest}'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            count_cache_key=self.get_count_cache_key(queryset, request, view)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+def get_keyset_ordering(view, default=()):
+    """Порядок курсорной пагинации представления.
+
+    Берётся из метода ``get_keyset_ordering`` (порядок может зависеть от
+    параметров запроса) или атрибута ``keyset_ordering``. None означает,
+    что для запроса курсорная пагинация невозможна.
+    """
+    getter = getattr(view, 'get_keyset_ordering', None)
+    if getter is not None:
+        return getter()
+    return getattr(view, 'keyset_ordering', default)
+
+
+def keyset_fields(view):
+    """Поля, значения которых нужны курсорной пагинации."""
+    return [
+        name.lstrip('-') for name in get_keyset_ordering(view) or ()
+    ]
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная (keyset) пагинация.
+
+    Страница выбирается условием по упорядоченным колонкам вместо
+    OFFSET, поэтому глубокие страницы не замедляются. Порядок задаётся
+    представлением (см. ``get_keyset_ordering``) и должен опираться на
+    индексированные колонки без NULL. Если для запроса порядок задать
+    нельзя, возвращается ошибка 400, а не страница в другом порядке.
+    """
+
+    ordering = ('-pk',)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = get_keyset_ordering(view, self.ordering)
+        if ordering is None:
+            raise ValidationError({PageOrCursorPagination.mode_query_param: [
+                'Курсорная пагинация недоступна для выбранной сортировки '
+                'или поиска, используйте постраничную'
+            ]})
+        return ordering
+
+
+class PageOrCursorPagination(CachedCountPagination):
+    """Постраничная пагинация с возможностью перейти на курсорную.
+
+    Режим выбирается параметром ``?pagination=cursor|page`` или атрибутом
+    представления ``pagination_mode``; по умолчанию используется
+    обычная постраничная пагинация.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_pagination_class = KeysetPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def get_mode(self, request, view):
+        mode = request.query_params.get(self.mode_query_param)
+        if mode in (PAGINATION_MODE_PAGE, PAGINATION_MODE_CURSOR):
+            return mode
+        return getattr(view, 'pagination_mode', PAGINATION_MODE_PAGE)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_mode(request, view) == PAGINATION_MODE_CURSOR:
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+            self.display_page_controls = (
+                self.cursor_paginator.display_page_controls
+            )
+            return page
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
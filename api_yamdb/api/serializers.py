@@ -1,15 +1,37 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, models, transaction
+from django.utils.encoding import smart_str
 
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 from rest_framework.validators import ValidationError
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.catalog import (attach_genre_ids, find_by_slugs, get_catalog,
+                             title_genre_ids)
+from reviews.importers import MODE_INSERT, MODES
+from reviews.models import (Category, Comment, Genre, ImportJob, Review,
+                            Title)
+from reviews.uploads import TABLES_BY_NAME, start_import_job, store_upload
 
 User = get_user_model()
 
 
+class SparseFieldsSerializerMixin:
+    """Оставляет только поля из ``context['sparse_fields']``, если они
+    заданы (см. ``api.mixin.SparseFieldsMixin``)."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse_fields = self.context.get('sparse_fields')
+        if sparse_fields is None:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if name in sparse_fields
+        }
+
+
 class CommentSerializer(serializers.ModelSerializer):
 
     author = SlugRelatedField(slug_field='username', read_only=True)
@@ -29,7 +51,8 @@ class CommentSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
 
     title = serializers.SlugRelatedField(
         slug_field='name',
@@ -48,19 +71,31 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, data):
-        request = self.context['request']
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        author = request.user
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(title=title, author=author).exists()
-        ):
-            raise ValidationError(
-                'Можно оставить только один отзыв на произведение'
-            )
+        # Произведение загружается представлением один раз за запрос;
+        # несуществующее произведение даёт 404 до сохранения отзыва.
+        self.context['view'].get_parent()
         return data
 
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_author_title,
+        # поэтому отдельный запрос exists() перед вставкой не нужен: он
+        # выполняется только после ошибки, чтобы не выдавать нарушение
+        # других ограничений за повторный отзыв.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data.get('author'),
+                title=validated_data.get('title')
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Можно оставить только один отзыв на произведение'
+                ]
+            })
+
     class Meta:
         model = Review
         fields = '__all__'
@@ -85,32 +120,109 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class CatalogSlugRelatedField(SlugRelatedField):
+    """SlugRelatedField, который ищет объект в справочнике процесса
+    вместо запроса к БД."""
+
+    def to_internal_value(self, data):
+        found = find_by_slugs(self.queryset.model, [smart_str(data)])
+        if not found:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return found[0]
+
+
+def field_catalog(field, model, ids):
+    """Снимок справочника, запомненный полем на время сериализации;
+    перечитывается, только если в нём нет объектов с id из ``ids``."""
+    catalog = getattr(field, '_catalog', None)
+    if catalog is None or not catalog.contains(ids):
+        catalog = field._catalog = get_catalog(model, ids)
+    return catalog
+
+
+class CatalogCategoryField(serializers.Field):
+    """Категория произведения по ``category_id`` из справочника."""
+
+    def __init__(self, **kwargs):
+        kwargs.update(source='category_id', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        ids = () if value is None else (value,)
+        return field_catalog(self, Category, ids).represent(
+            value, CategorySerializer
+        )
+
+
+class CatalogGenreField(serializers.Field):
+    """Жанры произведения по их id из справочника, по названию."""
+
+    # Жанры читаются из связующей таблицы, столбцы Title не нужны.
+    query_lookups = ()
+
+    def __init__(self, **kwargs):
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        genre_ids = title_genre_ids(title)
+        catalog = field_catalog(self, Genre, genre_ids)
+        genres = sorted(
+            (
+                catalog.by_id[genre_id]
+                for genre_id in genre_ids
+                if genre_id in catalog.by_id
+            ),
+            key=lambda genre: (genre.name, genre.pk)
+        )
+        return [
+            catalog.represent(genre.pk, GenreSerializer)
+            for genre in genres
+        ]
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Загружает жанры всех произведений страницы одним запросом."""
 
-    category = CategorySerializer(read_only=True)
-    genre = GenreSerializer(many=True, read_only=True)
+    def to_representation(self, data):
+        titles = list(data.all() if isinstance(data, models.Manager) else data)
+        if 'genre' in self.child.fields:
+            attach_genre_ids(titles)
+        return super().to_representation(titles)
+
+
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
+
+    category = CatalogCategoryField()
+    genre = CatalogGenreField()
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('review_count', 'score_sum')
+        list_serializer_class = TitleListSerializer
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
 
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         slug_field='slug',
         many=True,
         queryset=Genre.objects.all()
     )
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
     )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating', 'review_count', 'score_sum')
 
     def validate(self, value):
         if Title.objects.filter(
@@ -121,7 +233,65 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TitleBulkItemSerializer(TitleWriteSerializer):
+    """Элемент пакетного запроса ``titles/bulk/``.
+
+    Повтор названия в категории проверяется для всей пачки сразу
+    (см. ``TitleViewSet.bulk``), а не отдельным запросом на элемент.
+    """
+
+    def validate(self, value):
+        return value
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Задача импорта CSV-файла; при создании принимает файл."""
+
+    table = serializers.ChoiceField(choices=sorted(TABLES_BY_NAME))
+    mode = serializers.ChoiceField(choices=MODES, default=MODE_INSERT)
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = (
+            'id',
+            'table',
+            'mode',
+            'file',
+            'status',
+            'processed',
+            'created',
+            'updated',
+            'deleted',
+            'skipped',
+            'invalid',
+            'error',
+            'started_at',
+            'finished_at',
+        )
+        read_only_fields = (
+            'status',
+            'processed',
+            'created',
+            'updated',
+            'deleted',
+            'skipped',
+            'invalid',
+            'error',
+            'started_at',
+            'finished_at',
+        )
+
+    def create(self, validated_data):
+        validated_data['file_path'] = store_upload(validated_data.pop('file'))
+        job = super().create(validated_data)
+        start_import_job(job)
+        job.refresh_from_db()
+        return job
+
+
+class UserSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     """Сериализатор полей модели CustomUser."""
 
     class Meta:
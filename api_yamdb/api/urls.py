@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UsersViewSet, create_token,
-                    signup_user)
+                    ImportJobViewSet, ReviewViewSet, TitleViewSet,
+                    UsersViewSet, create_token, signup_user)
 
 router_v1 = DefaultRouter()
 
@@ -27,6 +27,7 @@ router_v1.register('users', UsersViewSet, basename='users')
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('titles', TitleViewSet, basename='titles')
+router_v1.register('imports', ImportJobViewSet, basename='imports')
 
 urlpatterns = [
     path('v1/auth/signup/', signup_user, name='signup'),
@@ -1,75 +1,129 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 
-from django.core.mail import send_mail
-
-from django.db.models import Avg
-
 from django_filters.rest_framework import DjangoFilterBackend
 
 from django.shortcuts import get_object_or_404
 
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-
-from api.filters import TitleFilter
-from reviews.models import Category, Genre, Review, Title
-
-from .mixin import ModelMixinSet
+from rest_framework.settings import api_settings
+
+from api.filters import FullTextSearchFilter, TitleFilter
+from reviews.bulk import save_titles
+from reviews.models import (Category, Comment, Genre, ImportJob, Review,
+                            Title)
+from reviews.versions import BULK_SUFFIX, object_version_keys, version_key
+from users.outbox import send_or_queue
+
+from .authentication import access_token_for, get_full_user
+from .expand import ExpandReviewsMixin
+from .mixin import (ConditionalGetMixin, ConditionalListMixin, ModelMixinSet,
+                    ParentObjectMixin, SparseFieldsMixin)
+from .pagination import CachedCountPagination, PageOrCursorPagination
 from .permissions import (AdminOnlyPermission, IsAdminOrReadOnlyPermission,
                           ModeratePermission)
 from .serializers import (CategorySerializer, CommentSerializer,
                           CreateTokenSerializer, GenreSerializer,
-                          ReviewSerializer, SignupSerializer, TitleSerializer,
-                          TitleWriteSerializer, UserSerializer,
-                          UserSerializerReadOnly)
+                          ImportJobSerializer, ReviewSerializer,
+                          SignupSerializer, TitleBulkItemSerializer,
+                          TitleSerializer, TitleWriteSerializer,
+                          UserSerializer, UserSerializerReadOnly)
+from .values_serializers import FastListMixin
 
 User = get_user_model()
 
+# Наибольшее количество произведений в одном запросе titles/bulk/.
+BULK_MAX_ITEMS = 1000
+# Поля ?ordering= произведений, по которым возможна курсорная пагинация.
+KEYSET_ORDERING_FIELDS = ('year', 'name')
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, FastListMixin, ParentObjectMixin,
+                     viewsets.ModelViewSet):
     """API для работы с комментариями к отзывам."""
 
     serializer_class = CommentSerializer
-    pagination_class = PageNumberPagination
+    etag_models = (Comment, User)
+    cache_anonymous_responses = True
+    pagination_class = PageOrCursorPagination
+    keyset_ordering = ('-pub_date', '-pk')
     permission_classes = (ModeratePermission,)
 
+    def resolve_parent(self):
+        return get_object_or_404(
+            Review.objects.select_related('title'),
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id')
+        )
+
+    def get_version_keys(self):
+        # После удаления отзыва его комментарии недоступны (404).
+        return super().get_version_keys() + object_version_keys(
+            Review, self.kwargs.get('review_id')
+        )
+
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return Comment.objects.filter(
+            review=self.get_parent()
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin, FastListMixin,
+                    ParentObjectMixin, viewsets.ModelViewSet):
     """API для работы с отзывами."""
 
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    etag_models = (Review, User)
+    cache_anonymous_responses = True
+    pagination_class = PageOrCursorPagination
+    keyset_ordering = ('-pub_date', '-pk')
     permission_classes = (ModeratePermission,)
 
+    def resolve_parent(self):
+        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+
+    def get_version_keys(self):
+        if self.action != 'list':
+            # Отзыв содержит название своего произведения.
+            return super().get_version_keys() + object_version_keys(
+                Title, self.kwargs.get('title_id')
+            )
+        # Изменение отзыва увеличивает версию его произведения, поэтому
+        # список отзывов зависит только от версии своего произведения.
+        return [
+            *object_version_keys(Title, self.kwargs.get('title_id')),
+            version_key(Review, BULK_SUFFIX),
+            version_key(User),
+        ]
+
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title=self.get_parent()
+        ).select_related('author', 'title')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ExpandReviewsMixin, ConditionalGetMixin,
+                   SparseFieldsMixin, FastListMixin, viewsets.ModelViewSet):
     """API для произведений."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).all().order_by('name')
-    pagination_class = PageNumberPagination
+    # Категории и жанры берутся из справочника процесса (reviews.catalog),
+    # поэтому соединения и prefetch для них не нужны.
+    queryset = Title.objects.order_by('name')
+    pagination_class = PageOrCursorPagination
+    keyset_ordering = ('name', 'pk')
+    count_cache_models = (Title, Category, Genre)
+    etag_models = (Title, Category, Genre)
+    cache_anonymous_responses = True
     permission_classes = (IsAdminOrReadOnlyPermission,)
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
@@ -79,37 +133,159 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleWriteSerializer
         return TitleSerializer
 
+    def get_keyset_ordering(self):
+        """Курсор строится по сортировке ``?ordering=`` и pk.
+
+        Порядок по релевантности ``?name=`` и сортировка по рейтингу
+        (он бывает NULL) курсором не выражаются — возвращается None.
+        """
+        params = self.request.query_params
+        if params.get('name'):
+            return None
+        ordering = [
+            name.strip() for name in params.get('ordering', '').split(',')
+            if name.strip()
+        ]
+        if not ordering:
+            return self.keyset_ordering
+        if any(name.lstrip('-') not in KEYSET_ORDERING_FIELDS
+               for name in ordering):
+            return None
+        return (*ordering, 'pk')
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Пакетное создание и изменение произведений.
+
+        Принимает список произведений; элемент с ``id`` изменяет
+        существующее произведение (передаются только меняющиеся поля),
+        без ``id`` — создаёт новое. Корректные элементы сохраняются, для
+        остальных возвращаются ошибки с номером элемента в списке.
+        """
+        items = request.data
+        if not isinstance(items, list) or len(items) > BULK_MAX_ITEMS:
+            return Response(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Ожидается список не более чем из {BULK_MAX_ITEMS} '
+                    f'произведений'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        errors = []
+        instances = Title.objects.in_bulk([
+            item['id'] for item in items
+            if isinstance(item, dict) and isinstance(item.get('id'), int)
+        ])
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'errors': {
+                    api_settings.NON_FIELD_ERRORS_KEY: ['Ожидается объект']
+                }})
+                continue
+            instance = None
+            if 'id' in item:
+                if isinstance(item['id'], int):
+                    # pop: одно произведение можно изменить один раз
+                    instance = instances.pop(item['id'], None)
+                if instance is None:
+                    errors.append({'index': index, 'errors': {
+                        'id': [
+                            'Произведение не найдено или уже изменяется '
+                            'другим элементом запроса'
+                        ]
+                    }})
+                    continue
+            serializer = TitleBulkItemSerializer(
+                instance, data=item, partial=instance is not None
+            )
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+                continue
+            valid.append((index, instance, serializer.validated_data))
+        creates, updates = self.split_bulk_items(valid, errors)
+        save_titles(creates, updates)
+        errors.sort(key=lambda error: error['index'])
+        return Response(
+            {
+                'created': [title.pk for title, _ in creates],
+                'updated': [title.pk for title, _ in updates],
+                'errors': errors,
+            },
+            status=(
+                status.HTTP_400_BAD_REQUEST
+                if errors and not (creates or updates)
+                else status.HTTP_200_OK
+            )
+        )
 
-class CategoryViewSet(ModelMixinSet):
+    @staticmethod
+    def split_bulk_items(valid, errors):
+        """Применяет проверенные данные к объектам и делит их на новые
+        и изменённые. Повторы названия в категории ищутся одним запросом
+        на всю пачку."""
+        taken = {
+            (name, category_id): pk
+            for pk, name, category_id in Title.objects.filter(name__in={
+                data.get('name', instance and instance.name)
+                for _, instance, data in valid
+            }).values_list('pk', 'name', 'category_id')
+        }
+        creates, updates = [], []
+        for index, instance, data in valid:
+            title = instance or Title()
+            for name, value in data.items():
+                if name != 'genre':
+                    setattr(title, name, value)
+            key = (title.name, title.category_id)
+            owner = title.pk or ('new', index)
+            if taken.setdefault(key, owner) != owner:
+                errors.append({'index': index, 'errors': {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Произведению уже была присвоена категория'
+                    ]
+                }})
+                continue
+            if instance is None:
+                creates.append((title, data['genre']))
+            else:
+                updates.append((title, data.get('genre')))
+        return creates, updates
+
+
+class CategoryViewSet(ConditionalListMixin, FastListMixin, ModelMixinSet):
     """API для категорий."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAdminOrReadOnlyPermission,)
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
     search_fields = ('name', )
     lookup_field = 'slug'
+    cache_anonymous_responses = True
 
 
-class GenreViewSet(ModelMixinSet):
+class GenreViewSet(ConditionalListMixin, FastListMixin, ModelMixinSet):
     """API для жанров."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAdminOrReadOnlyPermission,)
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
     search_fields = ('name', )
     lookup_field = 'slug'
+    cache_anonymous_responses = True
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
     """API для работы пользователями."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAuthenticated, AdminOnlyPermission,)
     filter_backends = [filters.SearchFilter]
     search_fields = ('username',)
@@ -121,9 +297,11 @@ class UsersViewSet(viewsets.ModelViewSet):
         """Запрос информации пользователя о себе, редактирование профиля
          пользователя."""
 
-        user = request.user
+        user = get_full_user(request.user)
         if request.method == 'GET':
-            serializer = UserSerializer(user)
+            serializer = UserSerializer(
+                user, context=self.get_serializer_context()
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         if request.method == 'PATCH':
@@ -141,11 +319,37 @@ class UsersViewSet(viewsets.ModelViewSet):
         )
 
 
+class ImportJobViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """API для загрузки CSV-файлов администраторами.
+
+    POST принимает multipart-форму с полями ``table``, ``mode`` и
+    ``file`` и сразу возвращает задачу со статусом 202; ход импорта
+    доступен по GET ``imports/{id}/``.
+
+    Задачи импорта не версионируются, поэтому количество в списке
+    считается без кэша.
+    """
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = (IsAuthenticated, AdminOnlyPermission,)
+    pagination_class = PageNumberPagination
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+
 def send_email(username, email, code):
     """Отправка письма с кодом подтверждения на почту регистрируемому
-    пользователю."""
+    пользователю (сразу или через очередь, см. users.outbox)."""
 
-    send_mail(
+    send_or_queue(
         'Подтверждение регистрации на сайте yamdb.',
         (f'Для получения токена и подтверждения регистрации сделайте '
          f'post-запрос со следующими параметрами:\n'
@@ -153,7 +357,6 @@ def send_email(username, email, code):
          f'confirmation_code: {code}'),
         'noreply@api_yamdb.com',
         [email],
-        fail_silently=False,
     )
 
 
@@ -193,6 +396,6 @@ def create_token(request):
         token=confirmation_code
     )
     if is_token_ok:
-        token = RefreshToken.for_user(user).access_token
+        token = access_token_for(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
     return Response(status=status.HTTP_400_BAD_REQUEST)
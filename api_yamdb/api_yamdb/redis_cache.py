@@ -0,0 +1,166 @@
+"""Бэкенд кэша Django для Redis-совместимых хранилищ.
+
+Клиент создаётся классом из ``OPTIONS['CLIENT_CLASS']`` (по умолчанию
+``redis.Redis``, пакет ``redis`` нужен только для этого бэкенда) вызовом
+``from_url(LOCATION)``. Бэкенду достаточно команд GET, SET (с EX и NX),
+MGET, DEL, EXISTS и FLUSHDB, поэтому вместо Redis можно подключить любое
+совместимое хранилище, например ``LocalRedisClient`` для тестов и локальной
+разработки.
+"""
+import pickle
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+DEFAULT_CLIENT_CLASS = 'redis.Redis'
+
+
+class RedisCache(BaseCache):
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._server = server
+        options = params.get('OPTIONS', {})
+        self._client_class = options.get('CLIENT_CLASS', DEFAULT_CLIENT_CLASS)
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            client_class = self._client_class
+            if isinstance(client_class, str):
+                client_class = import_string(client_class)
+            self._client = client_class.from_url(self._server)
+        return self._client
+
+    def get_expire(self, timeout=DEFAULT_TIMEOUT):
+        """Время жизни ключа в секундах для команды SET (None — бессрочно)."""
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout), 0)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        expire = self.get_expire(timeout)
+        if expire == 0:
+            return False
+        return bool(self.client.set(
+            self._key(key, version), pickle.dumps(value), ex=expire, nx=True
+        ))
+
+    def get(self, key, default=None, version=None):
+        value = self.client.get(self._key(key, version))
+        if value is None:
+            return default
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        expire = self.get_expire(timeout)
+        key = self._key(key, version)
+        if expire == 0:
+            self.client.delete(key)
+            return
+        self.client.set(key, pickle.dumps(value), ex=expire)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, version=version)
+        if value is None:
+            return False
+        self.set(key, value, timeout, version=version)
+        return True
+
+    def delete(self, key, version=None):
+        self.client.delete(self._key(key, version))
+
+    def has_key(self, key, version=None):
+        return bool(self.client.exists(self._key(key, version)))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self._key(key, version) for key in keys])
+        return {
+            key: pickle.loads(value)
+            for key, value in zip(keys, values) if value is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            self.set(key, value, timeout, version=version)
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        self.client.flushdb()
+
+    def close(self, **kwargs):
+        pass
+
+
+class LocalRedisClient:
+    """Хранилище в памяти процесса с подмножеством команд Redis.
+
+    Данные общие для всех клиентов с одинаковым адресом, как у
+    настоящего сервера.
+    """
+
+    _databases = {}
+    _lock = threading.Lock()
+
+    def __init__(self, url):
+        with self._lock:
+            self._data = self._databases.setdefault(url, {})
+
+    @classmethod
+    def from_url(cls, url):
+        return cls(url)
+
+    def _alive(self, key):
+        value, expires = self._data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def get(self, name):
+        with self._lock:
+            return self._alive(name)
+
+    def mget(self, names):
+        with self._lock:
+            return [self._alive(name) for name in names]
+
+    def set(self, name, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(name) is not None:
+                return None
+            expires = None if ex is None else time.monotonic() + ex
+            self._data[name] = (value, expires)
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(
+                self._data.pop(name, None) is not None for name in names
+            )
+
+    def exists(self, *names):
+        with self._lock:
+            return sum(self._alive(name) is not None for name in names)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
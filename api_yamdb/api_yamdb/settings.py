@@ -113,15 +113,77 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     )
 }
 
+# Кэш: 'locmem' (по умолчанию), 'file' или 'redis' — переменная окружения
+# CACHE_BACKEND, адрес или каталог — CACHE_LOCATION. Версии данных, от
+# которых зависят все кэши API, должны быть общими для всех процессов,
+# поэтому при нескольких воркерах нужен file или redis.
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+        ),
+    },
+    'redis': {
+        'BACKEND': 'api_yamdb.redis_cache.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379/0'),
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
+# Время хранения ответов API для анонимных пользователей; 0 — не кэшировать.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Кэширование количества записей в постраничных ответах API.
+PAGINATION_COUNT_CACHE_TIMEOUT = 300
+# Порог, начиная с которого вместо точного COUNT(*) используется оценка
+# планировщика (только PostgreSQL). None — всегда точный подсчёт.
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = None
+
+# Сериализовать списки для чтения из QuerySet.values() без создания
+# объектов моделей (api.values_serializers).
+FAST_READ_SERIALIZERS = False
+
+# Сколько секунд процесс использует снимок справочника категорий и жанров
+# (reviews.catalog) без перечитывания; 0 — перечитывать при каждом запросе.
+# С кэшем в памяти процесса (locmem) переименование и удаление категорий и
+# жанров доходят до остальных процессов не позже чем через это время.
+CATALOG_TIMEOUT = 60
+
+# Реализация полнотекстового поиска: 'fts5', 'postgres' или 'python'.
+# None — выбрать автоматически по используемой СУБД.
+SEARCH_BACKEND = None
+
+# Время хранения в кэше пользователя, найденного по JWT; 0 — не кэшировать.
+AUTH_USER_CACHE_TIMEOUT = 60
+# Добавлять в access-токены роль, флаги и версию токенов пользователя,
+# чтобы проверять права без загрузки пользователя из БД.
+JWT_ROLE_CLAIMS = False
+# Сколько секунд кэшируется версия токенов пользователя (0 — не кэшировать).
+# С кэшем в памяти процесса (locmem) отзыв токенов доходит до остальных
+# процессов не позже чем через это время.
+JWT_TOKEN_VERSION_CACHE_TIMEOUT = 60
+
+# Каталог для CSV-файлов, загруженных через API, и запуск импорта в
+# фоновом потоке (False — в том же запросе).
+IMPORT_UPLOAD_DIR = os.path.join(BASE_DIR, 'uploads')
+IMPORT_JOBS_IN_THREAD = True
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=31),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
@@ -132,5 +194,8 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Ставить письма в очередь OutgoingEmail вместо отправки во время запроса;
+# очередь разбирает команда send_queued_emails.
+EMAIL_USE_OUTBOX = os.getenv('EMAIL_USE_OUTBOX', '') == '1'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
@@ -30,7 +30,22 @@ class ReviewAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-admin.site.register(Title)
+class TitleAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'year',
+        'category',
+        'rating',
+        'review_count'
+    )
+    readonly_fields = ('rating', 'review_count', 'score_sum')
+    search_fields = ('name',)
+    list_filter = ('year',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Title, TitleAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Category)
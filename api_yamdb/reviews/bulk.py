@@ -0,0 +1,59 @@
+"""Пакетное сохранение произведений.
+
+Новые произведения вставляются одним ``bulk_create``, изменённые
+сохраняются одним ``bulk_update``, а связи с жанрами пишутся напрямую
+в связующую таблицу: одно удаление для изменённых произведений и одна
+вставка для всех. Сигналы при этом не вызываются, поэтому версии данных
+и поисковый индекс обновляются явно.
+"""
+from django.db import transaction
+
+from .models import Title
+from .search import get_search_backend
+from .versions import bump_version
+
+TITLE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+def _fetch_created_pks(titles):
+    """Первичные ключи только что вставленных строк для СУБД, которые
+    не возвращают их из ``bulk_create`` (SQLite).
+
+    Вызывается в той же транзакции, что и вставка: пишущий держит
+    блокировку базы, а ключи AUTOINCREMENT растут, поэтому последние
+    ``len(titles)`` строк — вставленные, в том же порядке.
+    """
+    pks = Title.objects.order_by('-pk').values_list('pk', flat=True)
+    for title, pk in zip(titles, reversed(list(pks[:len(titles)]))):
+        title.pk = pk
+
+
+def save_titles(creates, updates):
+    """Сохраняет пачку произведений.
+
+    ``creates`` — список пар (несохранённый Title, жанры), ``updates`` —
+    список пар (изменённый Title, жанры или None, если жанры не меняются).
+    """
+    links = Title.genre.through
+    with transaction.atomic():
+        new_titles = [title for title, _ in creates]
+        if new_titles:
+            Title.objects.bulk_create(new_titles)
+            if new_titles[0].pk is None:
+                _fetch_created_pks(new_titles)
+        if updates:
+            Title.objects.bulk_update(
+                [title for title, _ in updates], TITLE_FIELDS
+            )
+            links.objects.filter(title_id__in=[
+                title.pk for title, genres in updates if genres is not None
+            ]).delete()
+        links.objects.bulk_create([
+            links(title_id=title.pk, genre_id=genre.pk)
+            for title, genres in [*creates, *updates] if genres is not None
+            for genre in genres
+        ])
+    bump_version(Title)
+    get_search_backend().update_many(
+        [title for title, _ in [*creates, *updates]]
+    )
@@ -0,0 +1,118 @@
+"""Справочники категорий и жанров в памяти процесса.
+
+Категорий и жанров немного, а меняются они редко, поэтому каждый процесс
+держит снимок справочника (объекты по id и по slug) и перечитывает его
+из БД после изменения версии данных модели. Проверка версии — одно
+обращение к кэшу, запросов к БД при этом нет.
+
+С кэшем в памяти процесса (locmem) версии у процессов свои, и изменение
+в одном процессе другие не видят. Поэтому снимок перечитывается и не
+реже чем раз в ``CATALOG_TIMEOUT`` секунд, а объект, которого нет в
+снимке, ищется в БД: новые категории и жанры доступны сразу.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Title
+from .versions import model_versions
+
+
+class Catalog:
+    """Снимок справочника модели со slug."""
+
+    def __init__(self, objects):
+        self.by_id = {obj.pk: obj for obj in objects}
+        self.by_slug = {obj.slug: obj for obj in objects}
+        self._representations = {}
+
+    def contains(self, ids):
+        return all(pk in self.by_id for pk in ids)
+
+    def represent(self, pk, serializer_class):
+        """Представление объекта сериализатором, вычисляемое один раз
+        на снимок. Возвращается копия, которую можно изменять."""
+        key = (serializer_class, pk)
+        if key not in self._representations:
+            obj = self.by_id.get(pk)
+            self._representations[key] = (
+                None if obj is None else dict(serializer_class(obj).data)
+            )
+        data = self._representations[key]
+        return None if data is None else dict(data)
+
+
+# модель -> (версия данных, время загрузки, снимок)
+_catalogs = {}
+_lock = threading.Lock()
+
+
+def get_catalog(model, ids=()):
+    """Актуальный снимок справочника ``Category`` или ``Genre``.
+
+    Если в снимке нет объектов с id из ``ids`` (их создал другой
+    процесс), он перечитывается из БД.
+    """
+    version = model_versions(model)
+
+    def is_fresh(current):
+        return (
+            current is not None and current[0] == version
+            and time.monotonic() - current[1] < settings.CATALOG_TIMEOUT
+            and current[2].contains(ids)
+        )
+
+    current = _catalogs.get(model)
+    if is_fresh(current):
+        return current[2]
+    with _lock:
+        current = _catalogs.get(model)
+        if not is_fresh(current):
+            current = (
+                version,
+                time.monotonic(),
+                Catalog(list(model.objects.all()))
+            )
+            _catalogs[model] = current
+    return current[2]
+
+
+def find_by_slugs(model, slugs):
+    """Объекты справочника по slug; неизвестные slug пропускаются.
+
+    Slug, которого нет в снимке, проверяется запросом к БД: если объект
+    есть, его id добавляется к снимку перечитыванием справочника.
+    """
+    catalog = get_catalog(model)
+    missing = [slug for slug in slugs if slug not in catalog.by_slug]
+    if missing:
+        ids = model.objects.filter(
+            slug__in=missing
+        ).values_list('pk', flat=True)
+        catalog = get_catalog(model, list(ids))
+    return [catalog.by_slug[slug] for slug in slugs if slug in catalog.by_slug]
+
+
+def attach_genre_ids(titles):
+    """Загружает id жанров произведений одним запросом к связующей
+    таблице и сохраняет их в атрибуте ``genre_ids`` каждого объекта."""
+    by_pk = {title.pk: title for title in titles}
+    for title in titles:
+        title.genre_ids = []
+    links = Title.genre.through.objects.filter(
+        title_id__in=list(by_pk)
+    ).values_list('title_id', 'genre_id')
+    for title_id, genre_id in links:
+        by_pk[title_id].genre_ids.append(genre_id)
+    return titles
+
+
+def title_genre_ids(title):
+    """Id жанров произведения: из ``attach_genre_ids``, из
+    prefetch_related или отдельным запросом."""
+    if getattr(title, 'genre_ids', None) is not None:
+        return title.genre_ids
+    if 'genre' in getattr(title, '_prefetched_objects_cache', {}):
+        return [genre.pk for genre in title.genre.all()]
+    return attach_genre_ids([title])[0].genre_ids
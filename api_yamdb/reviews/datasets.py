@@ -0,0 +1,175 @@
+"""Описание CSV-файлов с данными проекта (``static/data``).
+
+Каждый файл соответствует одной модели; для колонок задано имя атрибута
+модели, а для внешних ключей — модель, на которую они ссылаются.
+"""
+from datetime import datetime
+from os import path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+
+class CsvTable:
+    """Соответствие CSV-файла модели."""
+
+    def __init__(self, filename, model, columns, foreign_keys=None,
+                 optional=()):
+        self.filename = filename
+        self.model = model
+        # колонка CSV -> attname поля модели
+        self.columns = columns
+        # attname внешнего ключа -> модель, на которую он ссылается
+        self.foreign_keys = foreign_keys or {}
+        # колонки, которых может не быть в файле: значения этих полей
+        # тогда не задаются и не изменяются при обновлении
+        self.optional = frozenset(optional)
+        self.fields = {
+            attname: self._get_field(attname)
+            for attname in columns.values()
+        }
+
+    @property
+    def name(self):
+        """Имя таблицы — имя файла без расширения."""
+        return path.splitext(self.filename)[0]
+
+    @property
+    def required_columns(self):
+        return set(self.columns) - self.optional
+
+    @property
+    def dependencies(self):
+        """Модели, строки которых должны быть загружены раньше."""
+        return set(self.foreign_keys.values()) - {self.model}
+
+    def _get_field(self, attname):
+        for field in self.model._meta.concrete_fields:
+            if field.attname == attname:
+                return field
+        raise ValueError(
+            f'{self.model.__name__} не содержит поля {attname}'
+        )
+
+    def to_python(self, row):
+        """Преобразует строку CSV в словарь значений полей модели.
+
+        Поля отсутствующих в файле необязательных колонок в словарь не
+        попадают.
+        """
+        values = {}
+        for column, attname in self.columns.items():
+            field = self.fields[attname]
+            value = row.get(column)
+            if value is None and column in self.optional:
+                continue
+            if value is None and not field.null:
+                raise ValidationError(f'Нет значения колонки {column}')
+            if value == '' and field.null:
+                value = None
+            value = field.to_python(value)
+            if isinstance(value, datetime) and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            values[attname] = value
+        return values
+
+    def row_id(self, row):
+        """Первичный ключ строки CSV или None, если его нельзя разобрать."""
+        for column, attname in self.columns.items():
+            if attname == 'id':
+                try:
+                    return self.fields[attname].to_python(row.get(column))
+                except ValidationError:
+                    return None
+        return None
+
+    def to_record(self, values):
+        """Преобразует кортеж значений полей (в порядке ``columns``)
+        в строку файла: колонка -> значение в формате исходных CSV."""
+        record = {}
+        for column, value in zip(self.columns, values):
+            if isinstance(value, datetime):
+                value = value.isoformat()
+                if value.endswith('+00:00'):
+                    value = value[:-6] + 'Z'
+            record[column] = value
+        return record
+
+    def __str__(self):
+        return self.filename
+
+
+TABLES = (
+    CsvTable(
+        'users.csv',
+        User,
+        {
+            'id': 'id',
+            'username': 'username',
+            'email': 'email',
+            'role': 'role',
+            'bio': 'bio',
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+        }
+    ),
+    CsvTable(
+        'category.csv',
+        Category,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'}
+    ),
+    CsvTable(
+        'genre.csv',
+        Genre,
+        {'id': 'id', 'name': 'name', 'slug': 'slug'}
+    ),
+    CsvTable(
+        'titles.csv',
+        Title,
+        {
+            'id': 'id',
+            'name': 'name',
+            'year': 'year',
+            'category': 'category_id',
+            'description': 'description',
+        },
+        foreign_keys={'category_id': Category},
+        optional=('description',)
+    ),
+    CsvTable(
+        'genre_title.csv',
+        Title.genre.through,
+        {'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id'},
+        foreign_keys={'title_id': Title, 'genre_id': Genre}
+    ),
+    CsvTable(
+        'review.csv',
+        Review,
+        {
+            'id': 'id',
+            'title_id': 'title_id',
+            'text': 'text',
+            'author': 'author_id',
+            'score': 'score',
+            'pub_date': 'pub_date',
+        },
+        foreign_keys={'title_id': Title, 'author_id': User}
+    ),
+    CsvTable(
+        'comments.csv',
+        Comment,
+        {
+            'id': 'id',
+            'review_id': 'review_id',
+            'text': 'text',
+            'author': 'author_id',
+            'pub_date': 'pub_date',
+        },
+        foreign_keys={'review_id': Review, 'author_id': User}
+    ),
+)
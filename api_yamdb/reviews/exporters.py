@@ -0,0 +1,45 @@
+"""Потоковая выгрузка данных в CSV или NDJSON.
+
+Строки читаются курсором базы данных пачками (``iterator``) и сразу
+записываются в файл, поэтому расход памяти не зависит от объёма данных.
+Колонки совпадают с форматом, который читает ``import_data``.
+"""
+import csv
+import json
+
+FORMAT_CSV = 'csv'
+FORMAT_NDJSON = 'ndjson'
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_records(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = (
+        table.model.objects
+        .order_by('pk')
+        .values_list(*table.columns.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    for values in rows:
+        yield table.to_record(values)
+
+
+def export_table(table, stream, fmt=FORMAT_CSV,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """Записывает таблицу в открытый текстовый поток и возвращает
+    количество выгруженных строк."""
+    if fmt not in FORMATS:
+        raise ValueError(f'Неизвестный формат выгрузки: {fmt}')
+    count = 0
+    if fmt == FORMAT_CSV:
+        writer = csv.DictWriter(stream, fieldnames=list(table.columns))
+        writer.writeheader()
+        for record in iter_records(table, chunk_size):
+            writer.writerow(record)
+            count += 1
+    else:
+        for record in iter_records(table, chunk_size):
+            stream.write(json.dumps(record, ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+    return count
@@ -0,0 +1,308 @@
+"""Пакетный импорт CSV-файлов в базу данных.
+
+Файлы читаются потоково; внешние ключи проверяются по заранее
+загруженным множествам идентификаторов, а строки записываются
+пачками, каждая в своей транзакции. Таблицы загружаются
+этапами в порядке зависимостей; независимые таблицы одного этапа могут
+загружаться параллельно.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from csv import DictReader
+from os import path
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, connections, router, transaction
+from django.db.models import F
+
+from .models import Review, Title
+from .ratings import rebuild_ratings
+from .search import SEARCH_FIELDS, get_search_backend
+from .versions import bump_version
+
+DEFAULT_BATCH_SIZE = 1000
+
+# insert — добавлять только новые строки;
+# upsert — также обновлять изменившиеся строки;
+# diff — как upsert, но ещё удалять строки, которых нет в файле.
+MODE_INSERT = 'insert'
+MODE_UPSERT = 'upsert'
+MODE_DIFF = 'diff'
+MODES = (MODE_INSERT, MODE_UPSERT, MODE_DIFF)
+
+
+class ImportResult:
+    """Итоги импорта одной таблицы."""
+
+    def __init__(self, table):
+        self.table = table
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.deleted = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return float(self.processed)
+        return self.processed / self.elapsed
+
+
+def insert_rows(model, objs, batch_size):
+    """``bulk_create``, сохраняющий даты из файла.
+
+    Строки вставляются как при ``loaddata`` (raw), поэтому ``pre_save``
+    не перезаписывает заданные значения auto_now/auto_now_add; пустые
+    значения таких полей заполняются как обычно. Настройки полей модели
+    общие для всего процесса и не меняются: импорт в фоновом потоке не
+    влияет на параллельные запросы API.
+    """
+    fields = model._meta.concrete_fields
+    auto_fields = [
+        field for field in fields
+        if getattr(field, 'auto_now_add', False)
+        or getattr(field, 'auto_now', False)
+    ]
+    for obj in objs:
+        for field in auto_fields:
+            if getattr(obj, field.attname) is None:
+                field.pre_save(obj, add=True)
+    using = router.db_for_write(model)
+    batch_size = min(
+        batch_size,
+        max(connections[using].ops.bulk_batch_size(fields, objs), 1)
+    )
+    for start in range(0, len(objs), batch_size):
+        model._base_manager._insert(
+            objs[start:start + batch_size], fields=fields, raw=True,
+            using=using
+        )
+
+
+class CsvImporter:
+    """Импорт набора CSV-таблиц из каталога ``data_dir``."""
+
+    def __init__(self, data_dir, batch_size=DEFAULT_BATCH_SIZE,
+                 mode=MODE_INSERT, progress=None):
+        if mode not in MODES:
+            raise ValueError(f'Неизвестный режим импорта: {mode}')
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.mode = mode
+        self.progress = progress or (lambda message: None)
+        self._ids = {}
+
+    @staticmethod
+    def stages(tables):
+        """Разбивает таблицы на этапы: таблицы этапа зависят только от
+        таблиц предыдущих этапов."""
+        models = {table.model for table in tables}
+        loaded = set()
+        remaining = list(tables)
+        stages = []
+        while remaining:
+            stage = [
+                table for table in remaining
+                if not (table.dependencies & models) - loaded
+            ]
+            if not stage:
+                raise ValueError(
+                    'Циклическая зависимость между таблицами: '
+                    + ', '.join(str(table) for table in remaining)
+                )
+            stages.append(stage)
+            loaded.update(table.model for table in stage)
+            remaining = [table for table in remaining if table not in stage]
+        return stages
+
+    def existing_ids(self, model):
+        """Множество идентификаторов модели, загружаемое один раз."""
+        if model not in self._ids:
+            self._ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator()
+            )
+        return self._ids[model]
+
+    def read_rows(self, table):
+        with open(
+                path.join(self.data_dir, table.filename),
+                encoding='utf-8',
+                newline=''
+        ) as csvfile:
+            yield from DictReader(csvfile)
+
+    def import_table(self, table):
+        result = ImportResult(table)
+        started = time.monotonic()
+        existing = self.existing_ids(table.model)
+        references = {
+            attname: self.existing_ids(model)
+            for attname, model in table.foreign_keys.items()
+        }
+        seen = set()
+        creates, updates = [], []
+        for row in self.read_rows(table):
+            result.processed += 1
+            try:
+                values = table.to_python(row)
+            except ValidationError:
+                result.invalid += 1
+                # Строка с ошибкой есть в файле, поэтому её строка в БД не
+                # удаляется; None — id разобрать не удалось.
+                seen.add(table.row_id(row))
+                continue
+            seen.add(values['id'])
+            if any(
+                values[attname] is not None and values[attname] not in ids
+                for attname, ids in references.items()
+            ):
+                result.invalid += 1
+                continue
+            if values['id'] in existing:
+                if self.mode == MODE_INSERT:
+                    result.skipped += 1
+                    continue
+                updates.append(values)
+            else:
+                existing.add(values['id'])
+                creates.append(table.model(**values))
+            if len(creates) + len(updates) >= self.batch_size:
+                self.write_batch(table, creates, updates, result)
+                creates, updates = [], []
+        if creates or updates:
+            self.write_batch(table, creates, updates, result)
+        if self.mode == MODE_DIFF:
+            self.delete_missing(table, existing, seen, result)
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def write_batch(self, table, creates, updates, result):
+        with transaction.atomic():
+            if updates:
+                creates.extend(self.apply_updates(table, updates, result))
+            insert_rows(table.model, creates, self.batch_size)
+        result.created += len(creates)
+        self.progress(
+            f'  {table}: обработано {result.processed}, '
+            f'добавлено {result.created}, обновлено {result.updated}'
+        )
+
+    def apply_updates(self, table, updates, result):
+        """Обновляет изменившиеся строки одним bulk_update.
+
+        Текущие значения загружаются одним запросом на пачку; строки,
+        которых уже нет в базе, возвращаются для вставки. Обновляются
+        только поля колонок, которые есть в файле.
+        """
+        current = table.model.objects.in_bulk(
+            [values['id'] for values in updates]
+        )
+        changed, missing, fields = [], [], set()
+        for values in updates:
+            obj = current.get(values['id'])
+            if obj is None:
+                missing.append(table.model(**values))
+                continue
+            names = [name for name in values if name != 'id']
+            if all(getattr(obj, name) == values[name] for name in names):
+                result.skipped += 1
+                continue
+            for name in names:
+                setattr(obj, name, values[name])
+            fields.update(names)
+            changed.append(obj)
+        if changed:
+            table.model.objects.bulk_update(
+                changed,
+                [name for name in table.columns.values() if name in fields],
+                self.batch_size
+            )
+        self.revoke_tokens(table, changed)
+        result.updated += len(changed)
+        return missing
+
+    @staticmethod
+    def revoke_tokens(table, changed):
+        """Отзывает токены пользователей, у которых изменились роль или
+        флаги: ``bulk_update`` не вызывает ``CustomUser.save()``, который
+        делает это при обычном сохранении."""
+        revoked = [
+            obj.pk for obj in changed
+            if hasattr(obj, 'claims_changed') and obj.claims_changed()
+        ]
+        if revoked:
+            table.model.objects.filter(pk__in=revoked).update(
+                token_version=F('token_version') + 1
+            )
+
+    def delete_missing(self, table, existing, seen, result):
+        """Удаляет строки, отсутствующие в файле (режим diff).
+
+        Если в файле есть строка без корректного id, неизвестно, какую
+        строку БД она описывает, и ничего не удаляется.
+        """
+        if None in seen:
+            self.progress(
+                f'  {table}: есть строки без корректного id, '
+                f'удаление отсутствующих строк пропущено'
+            )
+            return
+        ids = sorted(existing - seen)
+        for start in range(0, len(ids), self.batch_size):
+            chunk = ids[start:start + self.batch_size]
+            with transaction.atomic():
+                table.model.objects.filter(pk__in=chunk).delete()
+            result.deleted += len(chunk)
+        self.existing_ids(table.model).difference_update(ids)
+
+    def _import_in_thread(self, table):
+        try:
+            return self.import_table(table)
+        finally:
+            connections.close_all()
+
+    def run(self, tables, jobs=1):
+        results = []
+        for stage in self.stages(tables):
+            # Множества id загружаются до запуска потоков: внутри этапа
+            # каждый поток изменяет только множество своей модели.
+            for table in stage:
+                self.existing_ids(table.model)
+                for model in table.dependencies:
+                    self.existing_ids(model)
+            if jobs > 1 and len(stage) > 1:
+                with ThreadPoolExecutor(min(jobs, len(stage))) as executor:
+                    results.extend(
+                        executor.map(self._import_in_thread, stage)
+                    )
+            else:
+                results.extend(self.import_table(table) for table in stage)
+        self.finalize([table.model for table in tables])
+        return results
+
+    def finalize(self, models):
+        """Синхронизирует производные данные после массовой записи.
+
+        Пакетная запись не вызывает сигналы, поэтому рейтинги произведений
+        и поисковый индекс пересчитываются, а версии данных сбрасываются
+        явно. Также
+        сдвигаются последовательности первичных ключей, поскольку строки
+        вставлялись с явными id.
+        """
+        if Review in models or Title in models:
+            rebuild_ratings()
+        if Title.genre.through in models:
+            bump_version(Title)
+        for model in models:
+            bump_version(model)
+            if model in SEARCH_FIELDS:
+                get_search_backend().rebuild(model)
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,79 @@
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.datasets import TABLES
+from reviews.exporters import (DEFAULT_CHUNK_SIZE, FORMAT_CSV, FORMATS,
+                               export_table)
+
+
+class Command(BaseCommand):
+    """Выгрузка данных в csv- или ndjson-файлы."""
+
+    help = (
+        'Выгружает данные в формате, который читает import_data, '
+        'не загружая таблицы в память целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='export',
+            help='Каталог для файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=FORMAT_CSV,
+            help='Формат файлов: csv или ndjson (JSON-объект на строку).'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            'tables',
+            nargs='*',
+            help='Имена файлов для выгрузки, например review.csv. '
+                 'По умолчанию выгружаются все таблицы.'
+        )
+
+    def get_tables(self, names):
+        if not names:
+            return TABLES
+        tables = {table.filename: table for table in TABLES}
+        unknown = set(names) - set(tables)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(sorted(unknown))}.'
+            )
+        return [tables[name] for name in names]
+
+    def handle(self, *args, **options):
+        tables = self.get_tables(options['tables'])
+        fmt = options['format']
+        os.makedirs(options['path'], exist_ok=True)
+        total = 0
+        started = time.monotonic()
+        for table in tables:
+            filename = table.filename
+            if fmt != FORMAT_CSV:
+                filename = f'{filename.rsplit(".", 1)[0]}.{fmt}'
+            with open(
+                    os.path.join(options['path'], filename),
+                    'w',
+                    encoding='utf-8',
+                    newline=''
+            ) as stream:
+                count = export_table(
+                    table, stream, fmt, options['chunk_size']
+                )
+            total += count
+            self.stdout.write(f'Выгружено {count} записей в {filename}.')
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Выгружено {total} строк за {elapsed:.2f} с.'
+        )
@@ -1,72 +1,80 @@
-from collections import OrderedDict
-
-from csv import DictReader
-
-from django.contrib.auth import get_user_model
+import time
+from os import path
 
+from django.conf import settings
 from django.core.management import BaseCommand
+from django.db import connection
 
-from reviews.models import Category, Genre, Review, Title, Comment
-
-from os import path
-
-User = get_user_model()
+from reviews.datasets import TABLES
+from reviews.importers import (DEFAULT_BATCH_SIZE, MODE_INSERT, MODES,
+                               CsvImporter)
 
 
 class Command(BaseCommand):
     """Импорт данных из csv-файлов."""
 
-    def handle(self, *args, **options):
+    help = 'Импортирует данные из csv-файлов каталога static/data.'
 
-        path_gen_part = path.join('.', 'static', 'data')
-        files_models = {
-            'users.csv': User,
-            'category.csv': Category,
-            'genre.csv': Genre,
-            'titles.csv': Title,
-            'review.csv': Review,
-            'comments.csv': Comment
-        }
-        for file, model in files_models.items():
-            print(f'Импорт данных из файла {file}:')
-            with open(
-                    path.join(path_gen_part, file),
-                    encoding='utf-8',
-                    newline=''
-            ) as csvfile:
-                reader = DictReader(csvfile)
-                counter = 0
-                for row in reader:
-                    if not model.objects.filter(id=row['id']).exists():
-                        correct_row = []
-                        for key, value in row.items():
-                            if key == 'genre':
-                                correct_row.append(
-                                    (key,
-                                     Genre.objects.filter(id=value).first()
-                                     )
-                                )
-                            if key == 'category':
-                                continue
-                                correct_row.append(
-                                    (key,
-                                     Category.objects.filter(id=value).first()
-                                     )
-                                )
-                            elif key == 'title_id':
-                                correct_row.append(
-                                    ('title',
-                                     Title.objects.filter(id=value).first()
-                                     )
-                                )
-                            elif key == 'author':
-                                correct_row.append(
-                                    (key,
-                                     User.objects.filter(id=value).first()
-                                     )
-                                )
-                            else:
-                                correct_row.append((key, value))
-                        model.objects.create(**OrderedDict(correct_row))
-                        counter += 1
-                print(f'- импортировано {counter} записей.')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с csv-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пачке bulk_create.'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=MODES,
+            default=MODE_INSERT,
+            help=(
+                'insert — только новые строки; upsert — также обновить '
+                'изменившиеся; diff — как upsert, но ещё удалить строки, '
+                'отсутствующие в файлах.'
+            )
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=None,
+            help=(
+                'Количество потоков для параллельной загрузки независимых '
+                'таблиц. По умолчанию 1 для SQLite, иначе 4.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        jobs = options['jobs']
+        if jobs is None:
+            # SQLite допускает только одного пишущего, потоки бы ждали
+            # друг друга на блокировке базы.
+            jobs = 1 if connection.vendor == 'sqlite' else 4
+        importer = CsvImporter(
+            options['path'],
+            batch_size=options['batch_size'],
+            mode=options['mode'],
+            progress=self.stdout.write
+        )
+        started = time.monotonic()
+        results = importer.run(TABLES, jobs=jobs)
+        elapsed = time.monotonic() - started
+        total_rows = 0
+        for result in results:
+            self.stdout.write(
+                f'Импорт данных из файла {result.table}: '
+                f'импортировано {result.created} записей, '
+                f'обновлено {result.updated}, удалено {result.deleted}, '
+                f'без изменений {result.skipped}, '
+                f'отклонено {result.invalid} '
+                f'({result.rows_per_second:.0f} строк/с).'
+            )
+            total_rows += result.processed
+        rate = total_rows / elapsed if elapsed else total_rows
+        self.stdout.write(
+            f'Обработано {total_rows} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с).'
+        )
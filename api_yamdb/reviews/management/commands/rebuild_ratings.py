@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews.ratings import find_rating_mismatches, rebuild_ratings
+
+
+class Command(BaseCommand):
+    """Пересчёт и проверка сохранённых рейтингов произведений."""
+
+    help = 'Пересчитывает rating, review_count и score_sum у произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить агрегаты, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        mismatches = find_rating_mismatches()
+        for title in mismatches:
+            self.stdout.write(
+                f'- {title.pk} «{title}»: сохранено '
+                f'{title.review_count} отзывов / {title.score_sum} баллов / '
+                f'рейтинг {title.rating}, фактически {title.actual_count} / '
+                f'{title.actual_sum} / {title.actual_rating}.'
+            )
+        if options['check']:
+            if mismatches:
+                raise CommandError(
+                    f'Расхождения в рейтингах: {len(mismatches)}.'
+                )
+            self.stdout.write('Рейтинги произведений актуальны.')
+            return
+        updated = rebuild_ratings()
+        self.stdout.write(
+            f'Пересчитаны рейтинги {updated} произведений, '
+            f'исправлено расхождений: {len(mismatches)}.'
+        )
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+
+from reviews.search import SEARCH_FIELDS, get_search_backend
+
+
+class Command(BaseCommand):
+    """Перестроение поискового индекса."""
+
+    help = (
+        'Перестраивает поисковый индекс произведений, категорий и жанров '
+        '(на PostgreSQL создаёт GIN-индексы).'
+    )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        for model in SEARCH_FIELDS:
+            backend.rebuild(model)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: индекс перестроен '
+                f'({type(backend).__name__}).'
+            )
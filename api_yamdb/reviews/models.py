@@ -5,7 +5,7 @@ from users.models import CustomUser
 
 class Category(models.Model):
 
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     slug = models.SlugField(unique=True)
 
     class Meta:
@@ -17,7 +17,7 @@ class Category(models.Model):
 
 class Genre(models.Model):
 
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     slug = models.SlugField(unique=True)
 
     class Meta:
@@ -29,7 +29,7 @@ class Genre(models.Model):
 
 class Title(models.Model):
 
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     description = models.TextField(null=True)
     category = models.ForeignKey(
         Category,
@@ -42,7 +42,24 @@ class Title(models.Model):
         Genre,
         related_name='titles'
     )
-    year = models.IntegerField()
+    year = models.IntegerField(db_index=True)
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
 
     def __str__(self):
         return self.name
@@ -59,8 +76,23 @@ class Review(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(10)])
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем сохранённые в БД произведение и оценку, чтобы при
+        # изменении отзыва пересчитать агрегаты Title без лишнего запроса.
+        if 'title_id' in field_names and 'score' in field_names:
+            instance._rating_state = (instance.title_id, instance.score)
+        return instance
+
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('author', 'title'),
@@ -82,6 +114,58 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class ImportJob(models.Model):
+    """Загрузка CSV-файла через API (см. reviews.uploads)."""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'В очереди'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_DONE, 'Завершена'),
+        (STATUS_FAILED, 'Ошибка'),
+    )
+
+    table = models.CharField('Таблица', max_length=50)
+    mode = models.CharField('Режим', max_length=10)
+    status = models.CharField(
+        'Состояние',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    file_path = models.CharField('Файл', max_length=500, editable=False)
+    processed = models.PositiveIntegerField('Обработано строк', default=0)
+    created = models.PositiveIntegerField('Добавлено', default=0)
+    updated = models.PositiveIntegerField('Обновлено', default=0)
+    deleted = models.PositiveIntegerField('Удалено', default=0)
+    skipped = models.PositiveIntegerField('Без изменений', default=0)
+    invalid = models.PositiveIntegerField('Отклонено', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='import_jobs'
+    )
+    started_at = models.DateTimeField('Создана', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f'{self.table}: {self.status}'
@@ -0,0 +1,118 @@
+"""Поддержка денормализованного рейтинга произведений.
+
+Title хранит сумму оценок, количество отзывов и средний рейтинг.
+Значения обновляются инкрементально одним UPDATE при изменении отзывов
+и могут быть полностью пересчитаны командой ``rebuild_ratings``.
+"""
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, IntegerField, OuterRef, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Review, Title
+from .versions import bump_version
+
+
+def apply_score_delta(title_id, score_delta, count_delta):
+    """Сдвигает агрегаты произведения на заданные величины.
+
+    Все выражения вычисляются на стороне БД относительно текущих значений
+    строки, поэтому параллельные изменения отзывов не теряются.
+    """
+    new_sum = F('score_sum') + score_delta
+    new_count = F('review_count') + count_delta
+    return Title.objects.filter(pk=title_id).update(
+        score_sum=new_sum,
+        review_count=new_count,
+        rating=Case(
+            When(review_count__lte=-count_delta, then=Value(None)),
+            default=ExpressionWrapper(
+                Cast(new_sum, FloatField()) / new_count,
+                output_field=FloatField()
+            ),
+            output_field=FloatField()
+        )
+    )
+
+
+def _review_aggregate(aggregate, output_field):
+    reviews = (
+        Review.objects
+        .filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return Subquery(reviews, output_field=output_field)
+
+
+def rebuild_ratings(titles=None):
+    """Пересчитывает агрегаты для всех (или переданных) произведений.
+
+    Выполняется одним UPDATE с коррелированными подзапросами и возвращает
+    число обновлённых строк.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    updated = titles.order_by().update(
+        review_count=Coalesce(
+            _review_aggregate(Count('id'), IntegerField()), 0
+        ),
+        score_sum=Coalesce(
+            _review_aggregate(Sum('score'), IntegerField()), 0
+        ),
+        rating=_review_aggregate(Avg('score'), FloatField())
+    )
+    bump_version(Title)
+    return updated
+
+
+# Допустимая погрешность при сравнении сохранённого и фактического
+# среднего: оба вычисляются в плавающей точке, но разными выражениями.
+RATING_TOLERANCE = 1e-9
+
+
+def _rating_differs(stored, actual):
+    if stored is None or actual is None:
+        return stored is not actual
+    return abs(stored - actual) > RATING_TOLERANCE
+
+
+def find_rating_mismatches():
+    """Возвращает произведения, у которых сохранённые агрегаты расходятся
+    с фактическими данными отзывов."""
+    mismatches = []
+    titles = Title.objects.annotate(
+        actual_count=Count('reviews'),
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_rating=Avg('reviews__score'),
+    ).order_by('pk')
+    for title in titles:
+        if (
+            title.review_count != title.actual_count
+            or title.score_sum != title.actual_sum
+            or _rating_differs(title.rating, title.actual_rating)
+        ):
+            mismatches.append(title)
+    return mismatches
+
+
+def on_review_saved(review, created):
+    current = (review.title_id, int(review.score))
+    previous = getattr(review, '_rating_state', None)
+    if created:
+        apply_score_delta(review.title_id, current[1], 1)
+    elif previous is None:
+        rebuild_ratings(Title.objects.filter(pk=review.title_id))
+    elif previous != current:
+        apply_score_delta(previous[0], -previous[1], -1)
+        apply_score_delta(current[0], current[1], 1)
+    review._rating_state = current
+
+
+def on_review_deleted(review):
+    title_id, score = getattr(
+        review, '_rating_state', (review.title_id, review.score)
+    )
+    apply_score_delta(title_id, -int(score), -1)
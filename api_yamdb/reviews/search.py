@@ -0,0 +1,337 @@
+"""Полнотекстовый поиск по произведениям, категориям и жанрам.
+
+Поисковый запрос разбивается на слова; документ подходит, если содержит
+все слова запроса (слово может быть началом слова документа). Результаты
+упорядочены по релевантности, совпадения в названии весят больше, чем
+в описании. ``SqliteFtsBackend`` и ``PostgresSearchBackend`` фильтруют и
+ранжируют строки в самой БД, поэтому количество результатов не
+ограничено и пагинация работает как обычно.
+
+Реализации:
+
+* ``SqliteFtsBackend`` — таблицы FTS5, которые создаются после
+  ``migrate`` и обновляются сигналами после фиксации транзакций,
+  изменивших объекты;
+* ``PostgresSearchBackend`` — tsvector по выражению с GIN-индексом,
+  который поддерживает сама СУБД;
+* ``PythonSearchBackend`` — инвертированный индекс в памяти процесса,
+  перестраиваемый при изменении версии данных модели. Найденные ключи
+  передаются в запрос списком, поэтому запрос, подходящий более чем
+  к ``MAX_RESULTS`` объектам, отклоняется (``TooManyResults``).
+
+Реализация выбирается настройкой ``SEARCH_BACKEND`` (``fts5``,
+``postgres``, ``python``) или автоматически по используемой СУБД.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, When
+
+from .models import Category, Genre, Title
+from .versions import model_versions
+
+# Индексируемые поля и их веса при ранжировании.
+SEARCH_FIELDS = {
+    Title: (('name', 10.0), ('description', 1.0)),
+    Category: (('name', 1.0),),
+    Genre: (('name', 1.0),),
+}
+# Наибольшее число результатов PythonSearchBackend.
+MAX_RESULTS = 1000
+# Имя аннотации с релевантностью в отфильтрованном queryset.
+RANK = 'search_rank'
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return WORD_RE.findall((text or '').lower())
+
+
+class TooManyResults(Exception):
+    """Запросу соответствует больше объектов, чем может вернуть поиск."""
+
+
+class SearchBackend:
+
+    def filter(self, queryset, text):
+        """Оставляет в queryset найденные объекты и упорядочивает их по
+        убыванию релевантности."""
+        raise NotImplementedError
+
+    def update(self, instance):
+        pass
+
+    def update_many(self, instances):
+        for instance in instances:
+            self.update(instance)
+
+    def delete(self, model, pk):
+        pass
+
+    def rebuild(self, model=None):
+        pass
+
+
+class SqliteFtsBackend(SearchBackend):
+    """Поиск через виртуальные таблицы FTS5 (rowid = pk объекта)."""
+
+    def __init__(self):
+        self._ready = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def table(model):
+        return f'{model._meta.db_table}_fts'
+
+    @staticmethod
+    def columns(model):
+        return [name for name, _ in SEARCH_FIELDS[model]]
+
+    def ensure_table(self, model):
+        """Создаёт и заполняет таблицу FTS5, если её ещё нет.
+
+        Обычно таблицы создаются после ``migrate`` (см. ``signals``).
+        Таблица, созданная внутри транзакции, считается готовой только
+        после её фиксации: при откате таблица исчезает вместе с ней.
+        """
+        if model in self._ready:
+            return
+        with self._lock, connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=%s",
+                [self.table(model)]
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE {self.table(model)} USING fts5('
+                    f'{", ".join(self.columns(model))}, '
+                    f"tokenize='unicode61 remove_diacritics 2')"
+                )
+                self._populate(cursor, model)
+                if connection.in_atomic_block:
+                    transaction.on_commit(lambda: self._ready.add(model))
+                    return
+            self._ready.add(model)
+
+    def _populate(self, cursor, model):
+        columns = self.columns(model)
+        cursor.execute(
+            f'INSERT INTO {self.table(model)} (rowid, {", ".join(columns)}) '
+            f'SELECT id, {", ".join(columns)} FROM {model._meta.db_table}'
+        )
+
+    @staticmethod
+    def match_expression(text):
+        return ' '.join(f'"{token}"*' for token in tokenize(text))
+
+    def filter(self, queryset, text):
+        expression = self.match_expression(text)
+        if not expression:
+            return queryset.none()
+        model = queryset.model
+        self.ensure_table(model)
+        weights = ', '.join(str(weight) for _, weight in SEARCH_FIELDS[model])
+        table = self.table(model)
+        return queryset.extra(
+            select={RANK: f'bm25({table}, {weights})'},
+            tables=[table],
+            where=[
+                f'{table}.rowid = {model._meta.db_table}.id',
+                f'{table} MATCH %s',
+            ],
+            params=[expression]
+        ).order_by(RANK, 'pk')
+
+    def update(self, instance):
+        self.update_many([instance])
+
+    def update_many(self, instances):
+        if not instances:
+            return
+        model = type(instances[0])
+        self.ensure_table(model)
+        columns = self.columns(model)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table(model)} '
+                f'(rowid, {", ".join(columns)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(columns))})',
+                [
+                    [obj.pk] + [getattr(obj, name) for name in columns]
+                    for obj in instances
+                ]
+            )
+
+    def delete(self, model, pk):
+        self.ensure_table(model)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table(model)} WHERE rowid = %s', [pk]
+            )
+
+    def rebuild(self, model=None):
+        for model in [model] if model else SEARCH_FIELDS:
+            self.ensure_table(model)
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.table(model)}')
+                self._populate(cursor, model)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Поиск по tsvector; индексы создаёт команда ``rebuild_search_index``."""
+
+    config = 'simple'
+
+    def document(self, model, weighted=False, qualified=False):
+        parts = []
+        for name, weight in SEARCH_FIELDS[model]:
+            if qualified:
+                name = f'{model._meta.db_table}.{name}'
+            vector = f"to_tsvector('{self.config}', coalesce({name}, ''))"
+            if weighted:
+                label = 'A' if weight > 1 else 'B'
+                vector = f"setweight({vector}, '{label}')"
+            parts.append(vector)
+        return ' || '.join(parts)
+
+    def filter(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return queryset.none()
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        model = queryset.model
+        # Столбцы указываются с таблицей: queryset может соединять
+        # таблицы с такими же именами столбцов (name у категории).
+        tsquery = f"to_tsquery('{self.config}', %s)"
+        return queryset.extra(
+            select={RANK: (
+                f'ts_rank('
+                f'{self.document(model, weighted=True, qualified=True)}, '
+                f'{tsquery})'
+            )},
+            select_params=[query],
+            where=[f'({self.document(model, qualified=True)}) @@ {tsquery}'],
+            params=[query]
+        ).order_by(f'-{RANK}', 'pk')
+
+    def rebuild(self, model=None):
+        for model in [model] if model else SEARCH_FIELDS:
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_search_idx '
+                    f'ON {table} USING gin (({self.document(model)}))'
+                )
+
+
+class PythonSearchBackend(SearchBackend):
+    """Инвертированный индекс в памяти процесса.
+
+    Индекс модели строится при первом поиске и перестраивается, когда
+    меняется версия данных модели.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def build(self, model):
+        postings = defaultdict(lambda: defaultdict(float))
+        names = [name for name, _ in SEARCH_FIELDS[model]]
+        rows = model.objects.values_list('pk', *names).iterator()
+        for pk, *values in rows:
+            for (_, weight), value in zip(SEARCH_FIELDS[model], values):
+                for token in tokenize(value):
+                    postings[token][pk] += weight
+        return sorted(postings), postings
+
+    def get_index(self, model):
+        version = model_versions(model)
+        index = self._indexes.get(model)
+        if index is None or index[0] != version:
+            with self._lock:
+                index = (version, *self.build(model))
+                self._indexes[model] = index
+        return index[1:]
+
+    def search(self, model, text):
+        """Первичные ключи найденных объектов по убыванию релевантности."""
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        words, postings = self.get_index(model)
+        scores = None
+        for token in tokens:
+            token_scores = defaultdict(float)
+            position = bisect_left(words, token)
+            while position < len(words) and words[position].startswith(token):
+                for pk, score in postings[words[position]].items():
+                    token_scores[pk] += score
+                position += 1
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    pk: score + token_scores[pk]
+                    for pk, score in scores.items() if pk in token_scores
+                }
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [pk for pk, _ in ranked]
+
+    def filter(self, queryset, text):
+        pks = self.search(queryset.model, text)
+        if not pks:
+            return queryset.none()
+        if len(pks) > MAX_RESULTS:
+            raise TooManyResults(
+                f'Найдено больше {MAX_RESULTS} объектов, уточните запрос'
+            )
+        return queryset.filter(pk__in=pks).annotate(**{RANK: Case(
+            *(When(pk=pk, then=position) for position, pk in enumerate(pks)),
+            output_field=IntegerField()
+        )}).order_by(RANK)
+
+    def rebuild(self, model=None):
+        self._indexes.clear()
+
+
+def _sqlite_has_fts5():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+BACKENDS = {
+    'fts5': SqliteFtsBackend,
+    'postgres': PostgresSearchBackend,
+    'python': PythonSearchBackend,
+}
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        name = getattr(settings, 'SEARCH_BACKEND', None)
+        if name is None:
+            if connection.vendor == 'postgresql':
+                name = 'postgres'
+            elif _sqlite_has_fts5():
+                name = 'fts5'
+            else:
+                name = 'python'
+        _backend = BACKENDS[name]()
+    return _backend
+
+
+def search_queryset(queryset, text):
+    """Фильтрует queryset по поисковому запросу и упорядочивает
+    результаты по релевантности (см. ``SearchBackend.filter``)."""
+    return get_search_backend().filter(queryset, text)
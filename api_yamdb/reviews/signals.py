@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from users.models import CustomUser
+
+from .models import Category, Comment, Genre, Review, Title
+from .ratings import on_review_deleted, on_review_saved
+from .search import SEARCH_FIELDS, get_search_backend
+from .versions import bump_version
+
+VERSIONED_MODELS = (Category, Genre, Title, Review, Comment, CustomUser)
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, **kwargs):
+    on_review_saved(instance, created)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    on_review_deleted(instance)
+
+
+def bump_data_version(sender, instance, **kwargs):
+    bump_version(sender, instance.pk)
+    if sender is Review:
+        # Отзыв меняет рейтинг, который хранится в произведении.
+        bump_version(Title, instance.title_id)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_data_version, sender=model)
+    post_delete.connect(bump_data_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_version_on_genre_change(sender, instance, **kwargs):
+    if kwargs['action'].startswith('post_'):
+        if isinstance(instance, Title):
+            bump_version(Title, instance.pk)
+        else:
+            bump_version(Title)
+
+
+def update_search_index(sender, instance, **kwargs):
+    # Индекс обновляется после фиксации: при откате транзакции в нём не
+    # остаётся несуществующих данных.
+    transaction.on_commit(lambda: get_search_backend().update(instance))
+
+
+def delete_from_search_index(sender, instance, **kwargs):
+    # После удаления Django обнуляет pk объекта, поэтому он запоминается.
+    pk = instance.pk
+    transaction.on_commit(lambda: get_search_backend().delete(sender, pk))
+
+
+for model in SEARCH_FIELDS:
+    post_save.connect(update_search_index, sender=model)
+    post_delete.connect(delete_from_search_index, sender=model)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, **kwargs):
+    """Создаёт поисковые таблицы и индексы сразу после ``migrate``, вне
+    транзакций запросов."""
+    if sender.name == 'reviews':
+        get_search_backend().rebuild()
@@ -0,0 +1,111 @@
+"""Импорт CSV-файлов, загруженных через API.
+
+Файл сохраняется на диск по частям, после чего строки читаются потоком
+и записываются пачками тем же ``CsvImporter``, что и у команды
+``import_data``, поэтому память не зависит от размера файла. Счётчики
+задачи ``ImportJob`` обновляются после каждой пачки, чтобы клиент мог
+следить за ходом импорта. Задача выполняется в фоновом потоке (или сразу,
+если ``IMPORT_JOBS_IN_THREAD = False``).
+"""
+import os
+import threading
+import uuid
+from csv import DictReader
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .datasets import TABLES
+from .importers import CsvImporter
+from .models import ImportJob
+
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+def store_upload(uploaded_file):
+    """Сохраняет загруженный файл по частям и возвращает путь к нему."""
+    os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(
+        settings.IMPORT_UPLOAD_DIR, f'{uuid.uuid4().hex}.csv'
+    )
+    with open(file_path, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+    return file_path
+
+
+class UploadImporter(CsvImporter):
+    """Импорт одной таблицы из файла задачи с сохранением прогресса."""
+
+    def __init__(self, job, **kwargs):
+        super().__init__(
+            os.path.dirname(job.file_path), mode=job.mode, **kwargs
+        )
+        self.job = job
+
+    def read_rows(self, table):
+        with open(self.job.file_path, encoding='utf-8', newline='') as file:
+            reader = DictReader(file)
+            missing = table.required_columns - set(reader.fieldnames or ())
+            if missing:
+                raise ValueError(
+                    'В файле нет колонок: ' + ', '.join(sorted(missing))
+                )
+            yield from reader
+
+    def write_batch(self, table, creates, updates, result):
+        super().write_batch(table, creates, updates, result)
+        self.save_progress(result)
+
+    def save_progress(self, result, **fields):
+        ImportJob.objects.filter(pk=self.job.pk).update(
+            processed=result.processed,
+            created=result.created,
+            updated=result.updated,
+            deleted=result.deleted,
+            skipped=result.skipped,
+            invalid=result.invalid,
+            **fields
+        )
+
+
+def run_import_job(job_id):
+    job = ImportJob.objects.get(pk=job_id)
+    table = TABLES_BY_NAME[job.table]
+    job.status = ImportJob.STATUS_RUNNING
+    job.save(update_fields=['status'])
+    importer = UploadImporter(job)
+    try:
+        result = importer.import_table(table)
+        importer.finalize([table.model])
+    except Exception as error:
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.STATUS_FAILED,
+            error=f'{type(error).__name__}: {error}',
+            finished_at=timezone.now()
+        )
+    else:
+        importer.save_progress(
+            result,
+            status=ImportJob.STATUS_DONE,
+            finished_at=timezone.now()
+        )
+    finally:
+        os.remove(job.file_path)
+
+
+def _run_in_thread(job_id):
+    try:
+        run_import_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def start_import_job(job):
+    if settings.IMPORT_JOBS_IN_THREAD:
+        threading.Thread(
+            target=_run_in_thread, args=(job.pk,), daemon=True
+        ).start()
+    else:
+        run_import_job(job.pk)
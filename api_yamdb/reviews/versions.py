@@ -0,0 +1,96 @@
+"""Версии данных для инвалидации кэшей.
+
+Для каждой модели в кэше хранится номер версии, который увеличивается
+при любом изменении её строк. Кэшированные значения (количество записей,
+ответы API, справочники) включают версии в ключ и становятся
+недействительными сразу после изменения данных без явного удаления.
+
+Версия — время последнего изменения в миллисекундах, поэтому её можно
+использовать как отметку Last-Modified, а при потере ключа в кэше
+новая версия гарантированно отличается от всех выданных ранее.
+
+Версии увеличиваются только после фиксации транзакции: иначе
+параллельный запрос мог бы закэшировать ещё не зафиксированное
+состояние под новой версией.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY_PREFIX = 'data-version'
+# Суффикс версии массовых изменений модели, при которых неизвестно,
+# какие именно строки изменились (импорт, UPDATE по queryset).
+BULK_SUFFIX = '*'
+# Сколько хранится отметка о выданной версии (см. _claim_version):
+# достаточно пережить одновременные изменения, дальше версии растут
+# вместе со временем.
+VERSION_CLAIM_TIMEOUT = 60
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def version_key(model, pk=None):
+    key = f'{VERSION_KEY_PREFIX}:{model._meta.label_lower}'
+    if pk is not None:
+        key = f'{key}:{pk}'
+    return key
+
+
+def get_versions(*keys):
+    """Возвращает версии для ключей ``version_key`` в том же порядке."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _now(), None)
+            versions[key] = cache.get(key) or _now()
+    return tuple(versions[key] for key in keys)
+
+
+def model_versions(*models):
+    return get_versions(*(version_key(model) for model in models))
+
+
+def object_version_keys(model, pk):
+    """Ключи версий, от которых зависит отдельный объект: его собственная
+    версия и версия массовых изменений модели."""
+    return [version_key(model, pk), version_key(model, BULK_SUFFIX)]
+
+
+def _claim_version(key, version):
+    """Первое свободное значение версии ключа, начиная с ``version``.
+
+    ``cache.add`` атомарен, поэтому одновременные изменения получают
+    разные версии и ни одно из них не теряется.
+    """
+    while not cache.add(f'{key}@{version}', True, VERSION_CLAIM_TIMEOUT):
+        version += 1
+    return version
+
+
+def _bump_keys(keys):
+    current = cache.get_many(keys)
+    now = _now()
+    cache.set_many(
+        {
+            key: _claim_version(key, max(now, current.get(key, 0) + 1))
+            for key in keys
+        },
+        None
+    )
+
+
+def bump_version(model, pk=None):
+    """Увеличивает версию модели и версию объекта ``pk``; без ``pk``
+    изменение считается массовым и затрагивает все объекты модели.
+
+    Внутри транзакции версии увеличиваются после её фиксации, при
+    откате транзакции — не изменяются.
+    """
+    keys = [
+        version_key(model),
+        version_key(model, BULK_SUFFIX if pk is None else pk)
+    ]
+    transaction.on_commit(lambda: _bump_keys(keys))
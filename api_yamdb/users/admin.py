@@ -2,6 +2,7 @@ from django.contrib.admin import ModelAdmin, register
 from django.contrib.auth import get_user_model
 
 from .forms import UserForm
+from .models import OutgoingEmail
 
 User = get_user_model()
 
@@ -24,3 +25,16 @@ class UserAdmin(ModelAdmin):
         'role',
         'bio'
     )
+
+
+@register(OutgoingEmail)
+class OutgoingEmailAdmin(ModelAdmin):
+    list_display = (
+        'recipient',
+        'subject',
+        'created',
+        'attempts',
+        'sent_at'
+    )
+    list_filter = ('sent_at',)
+    readonly_fields = ('created',)
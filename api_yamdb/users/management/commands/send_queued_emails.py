@@ -0,0 +1,70 @@
+import time
+
+from django.core.management import BaseCommand
+
+from users.outbox import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ATTEMPTS, send_batch
+
+
+class Command(BaseCommand):
+    """Обработчик очереди исходящих писем."""
+
+    help = 'Отправляет письма из очереди OutgoingEmail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=DEFAULT_MAX_ATTEMPTS,
+            help='Сколько раз пытаться отправить письмо.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новых писем.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop, секунд.'
+        )
+
+    def send_all(self, batch_size, max_attempts):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_batch(batch_size, max_attempts)
+            total_sent += sent
+            total_failed += failed
+            # Пачка без единого отправленного письма — вероятно, почтовый
+            # сервер недоступен: следующая попытка после паузы.
+            if sent + failed < batch_size or not sent:
+                return total_sent, total_failed
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                total_sent, total_failed = self.send_all(
+                    options['batch_size'], options['max_attempts']
+                )
+            except Exception as error:
+                if not options['loop']:
+                    raise
+                # Обработчик в режиме --loop не завершается из-за ошибки
+                # одной итерации (например, недоступной БД).
+                self.stderr.write(f'Ошибка обработки очереди: {error}')
+                time.sleep(options['interval'])
+                continue
+            if total_sent or total_failed or not options['loop']:
+                self.stdout.write(
+                    f'Отправлено писем: {total_sent}, '
+                    f'ошибок: {total_failed}.'
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
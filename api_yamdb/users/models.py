@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 ROLE_USER = 'user'
 ROLE_ADMIN = 'admin'
@@ -47,6 +48,47 @@ class CustomUser(AbstractUser):
         default=ROLE_USER,
         verbose_name='Роль'
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия токенов'
+    )
+
+    # Поля, которые копируются в access-токен в режиме JWT_ROLE_CLAIMS:
+    # их изменение отзывает выданные ранее токены.
+    CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser',
+                    'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in field_names for name in cls.CLAIM_FIELDS):
+            instance._claims_state = instance.claims_state()
+        return instance
+
+    def claims_state(self):
+        return tuple(getattr(self, name) for name in self.CLAIM_FIELDS)
+
+    def claims_changed(self):
+        """Изменились ли поля ``CLAIM_FIELDS`` с момента загрузки из БД."""
+        state = getattr(self, '_claims_state', None)
+        return state is not None and state != self.claims_state()
+
+    def save(self, *args, **kwargs):
+        if self.claims_changed():
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'
+                }
+        super().save(*args, **kwargs)
+        self._claims_state = self.claims_state()
+
+    def revoke_tokens(self):
+        """Делает недействительными все выданные пользователю токены
+        с ролью в режиме JWT_ROLE_CLAIMS."""
+        self.token_version += 1
+        self.save()
 
     @property
     def is_user(self):
@@ -67,3 +109,41 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. users.outbox)."""
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(max_length=254, verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Отправить не раньше'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ['send_after', 'pk']
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'send_after'],
+                name='outgoing_email_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,122 @@
+"""Очередь исходящих писем.
+
+При ``EMAIL_USE_OUTBOX = True`` письма не отправляются во время запроса,
+а сохраняются в таблицу ``OutgoingEmail``. Команда ``send_queued_emails``
+отправляет их пачками через одно соединение с почтовым сервером. Письмо,
+которое не удалось отправить, повторяется с экспоненциально растущей
+паузой, пока не будет исчерпано ``max_attempts`` попыток.
+"""
+from contextlib import suppress
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+# Пауза перед повторной попыткой: 30 с, 1 мин, 2 мин, ... но не больше часа.
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def send_or_queue(subject, body, from_email, recipients):
+    """Отправляет письмо сразу или ставит его в очередь, если включена
+    настройка ``EMAIL_USE_OUTBOX``."""
+    if not settings.EMAIL_USE_OUTBOX:
+        send_mail(subject, body, from_email, recipients, fail_silently=False)
+        return
+    OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(
+            subject=subject,
+            body=body,
+            from_email=from_email,
+            recipient=recipient
+        )
+        for recipient in recipients
+    ])
+
+
+def retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def pending_emails(max_attempts=DEFAULT_MAX_ATTEMPTS, now=None):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=now or timezone.now(),
+        attempts__lt=max_attempts
+    )
+
+
+def _mark_failed(email, error, now):
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.send_after = now + retry_delay(email.attempts)
+
+
+def _send_all(emails, mail_connection):
+    """Отправляет письма через открытое соединение; возвращает пару
+    (отправлено, ошибок)."""
+    now = timezone.now()
+    sent = failed = 0
+    for email in emails:
+        message = EmailMessage(
+            email.subject,
+            email.body,
+            email.from_email,
+            [email.recipient],
+            connection=mail_connection
+        )
+        try:
+            message.send()
+        except Exception as error:
+            _mark_failed(email, error, now)
+            failed += 1
+        else:
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            sent += 1
+    return sent, failed
+
+
+def send_batch(batch_size=DEFAULT_BATCH_SIZE,
+               max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Отправляет одну пачку писем из очереди.
+
+    Возвращает пару (отправлено, ошибок). Строки пачки блокируются до
+    конца транзакции; на СУБД с SKIP LOCKED несколько обработчиков
+    разбирают очередь параллельно, не мешая друг другу. Если соединение
+    с почтовым сервером не открывается, неудачной считается попытка
+    отправки всех писем пачки.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = pending_emails(max_attempts, now)
+        if connection.features.has_select_for_update_skip_locked:
+            emails = emails.select_for_update(skip_locked=True)
+        emails = list(emails[:batch_size])
+        if not emails:
+            return 0, 0
+        for email in emails:
+            email.attempts += 1
+        mail_connection = get_connection(fail_silently=False)
+        try:
+            mail_connection.open()
+        except Exception as error:
+            for email in emails:
+                _mark_failed(email, error, now)
+            sent, failed = 0, len(emails)
+        else:
+            try:
+                sent, failed = _send_all(emails, mail_connection)
+            finally:
+                # Ошибка при закрытии не отменяет уже отправленные письма.
+                with suppress(Exception):
+                    mail_connection.close()
+        OutgoingEmail.objects.bulk_update(
+            emails, ['attempts', 'sent_at', 'send_after', 'last_error']
+        )
+    return sent, failed
@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from .common import create_reviews
+
+
+class Test08TitleRating:
+
+    @staticmethod
+    def get_title(title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_stored_on_create(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum) == (3, 12), (
+            'Проверьте, что при создании отзыва обновляются `review_count` и `score_sum` произведения'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что при создании отзыва пересчитывается `rating` произведения'
+        )
+        title = self.get_title(titles[1]['id'])
+        assert title.rating is None and title.review_count == 0, (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rating_updated_on_edit_and_delete(self, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        admin_client.patch(url, data={'score': 2})
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (3, 9, 3), (
+            'Проверьте, что при изменении оценки пересчитывается рейтинг произведения'
+        )
+        admin_client.delete(url)
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (2, 7, 3.5), (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг произведения'
+        )
+        user.delete()
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (1, 4, 4), (
+            'Проверьте, что при каскадном удалении отзывов пересчитывается рейтинг произведения'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') == 4
+        assert 'score_sum' not in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('rebuild_ratings', '--check')
+        Title.objects.update(review_count=0, score_sum=0, rating=None)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (3, 12, 4), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает агрегаты произведений'
+        )
+        call_command('rebuild_ratings', '--check')
+        Title.objects.filter(pk=titles[0]['id']).update(rating=9)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        assert self.get_title(titles[0]['id']).rating == 4, (
+            'Проверьте, что `rebuild_ratings --check` находит неверный '
+            'сохранённый рейтинг'
+        )
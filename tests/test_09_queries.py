@@ -0,0 +1,165 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url, warm=False):
+    if warm:
+        # справочники и закэшированные данные загружаются первым запросом
+        client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+    )
+    return len(context)
+
+
+def fill_titles(count):
+    from reviews.models import Category, Genre, Title
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.get_or_create(name='Драма', slug='drama')[0],
+        Genre.objects.get_or_create(name='Комедия', slug='comedy')[0],
+    ]
+    titles = []
+    for i in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+class Test09QueryCount:
+    """Количество запросов к БД не должно зависеть от размера страницы."""
+
+    # адрес -> допустимое количество запросов к БД
+    endpoints = {
+        '/api/v1/titles/': 3,
+        '/api/v1/titles/?genre=drama': 3,
+        '/api/v1/titles/?category=films': 3,
+        # дополнительный запрос к поисковому индексу
+        '/api/v1/titles/?name=Произведение': 4,
+    }
+    max_queries = 3
+
+    @pytest.fixture(autouse=True)
+    def no_response_cache(self, settings):
+        # измеряется работа с БД при формировании ответа
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+
+    def assert_constant(self, client, urls, fill_more):
+        if not isinstance(urls, dict):
+            urls = dict.fromkeys(urls, self.max_queries)
+        small_counts = [count_queries(client, url, warm=True) for url in urls]
+        fill_more()
+        for (url, budget), small_count in zip(urls.items(), small_counts):
+            large_count = count_queries(client, url, warm=True)
+            assert small_count == large_count, (
+                f'Проверьте, что количество запросов `{url}` не зависит от '
+                f'размера страницы: {small_count} и {large_count}'
+            )
+            assert large_count <= budget, (
+                f'Проверьте, что GET запрос `{url}` выполняет не более '
+                f'{budget} запросов к БД, сейчас {large_count}'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_list(self, client):
+        fill_titles(1)
+        self.assert_constant(client, self.endpoints, lambda: fill_titles(9))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_detail(self, client):
+        titles = fill_titles(2)
+        queries = count_queries(
+            client, f'/api/v1/titles/{titles[0].pk}/', warm=True
+        )
+        assert queries <= 2, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/` '
+            f'выполняет не более 2 запросов к БД, сейчас {queries}'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reviews_and_comments_list(self, client, django_user_model):
+        from reviews.models import Comment, Review
+        title = fill_titles(1)[0]
+        authors = iter(
+            django_user_model.objects.create_user(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            )
+            for i in range(20)
+        )
+
+        def add_reviews(count):
+            for _ in range(count):
+                Review.objects.create(
+                    title=title, author=next(authors), text='text', score=5
+                )
+
+        add_reviews(1)
+        review = Review.objects.get()
+
+        def add_comments(count):
+            for _ in range(count):
+                Comment.objects.create(
+                    review=review, author=next(authors), text='text'
+                )
+
+        add_comments(1)
+        urls = (
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+
+        def fill_more():
+            add_reviews(9)
+            add_comments(9)
+
+        self.assert_constant(client, urls, fill_more)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_nested_create(self, user_client, user):
+        from reviews.models import Review
+        title = fill_titles(2)[0]
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == 201
+        # пользователь, произведение, BEGIN, вставка отзыва и рейтинг
+        assert len(context) <= 5, (
+            f'Проверьте, что POST запрос `{url}` загружает произведение '
+            f'один раз, сейчас запросов к БД: {len(context)}'
+        )
+        response = user_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == 400, (
+            f'Проверьте, что повторный POST запрос `{url}` возвращает статус 400'
+        )
+        review = Review.objects.get()
+        other_title = fill_titles(1)[0]
+        response = user_client.post(
+            f'/api/v1/titles/{other_title.pk}/reviews/{review.pk}/comments/',
+            data={'text': 'text'}
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий к отзыву другого произведения '
+            'возвращает статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_other_integrity_errors(self, user_client, monkeypatch):
+        from django.db import IntegrityError
+        from reviews.models import Review
+        title = fill_titles(1)[0]
+
+        def broken_save(*args, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(Review, 'save', broken_save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                data={'text': 'text', 'score': 5}
+            )
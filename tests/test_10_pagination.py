@@ -0,0 +1,121 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+
+class Test10CursorPagination:
+
+    def walk(self, client, url):
+        results = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не выполняет подсчёт записей'
+            )
+            results.extend(data['results'])
+            url = data['next']
+            pages += 1
+        return results, pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        fill_titles(25)
+        results, pages = self.walk(client, '/api/v1/titles/?pagination=cursor')
+        names = [title['name'] for title in results]
+        assert pages == 3 and len(set(names)) == 25, (
+            'Проверьте, что при `?pagination=cursor` курсорная пагинация '
+            'возвращает все произведения без повторов'
+        )
+        assert names == sorted(names), (
+            'Проверьте, что курсорная пагинация сохраняет порядок по `name`'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 25, (
+            'Проверьте, что по умолчанию используется постраничная пагинация'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, client, django_user_model):
+        from reviews.models import Review
+        title = fill_titles(1)[0]
+        for i in range(15):
+            author = django_user_model.objects.create_user(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'text{i}', score=5
+            )
+        results, pages = self.walk(
+            client, f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        )
+        assert pages == 2 and len({review['id'] for review in results}) == 15, (
+            'Проверьте, что курсорная пагинация отзывов возвращает все отзывы'
+        )
+        dates = [review['pub_date'] for review in results]
+        assert dates == sorted(dates, reverse=True), (
+            'Проверьте, что курсорная пагинация отзывов упорядочена по `-pub_date`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_titles_cursor_ordering(self, client):
+        titles = fill_titles(25)
+        for title in titles:
+            title.year = 2000 + (title.pk * 7) % 5
+            title.save()
+        results, _ = self.walk(
+            client, '/api/v1/titles/?pagination=cursor&ordering=-year'
+        )
+        from reviews.models import Title
+        expected = Title.objects.order_by('-year', 'pk')
+        assert [title['id'] for title in results] == list(
+            expected.values_list('pk', flat=True)
+        ), (
+            'Проверьте, что курсорная пагинация учитывает `?ordering=`'
+        )
+        for query in ('ordering=-rating', 'name=Произведение'):
+            response = client.get(f'/api/v1/titles/?pagination=cursor&{query}')
+            assert response.status_code == 400, (
+                f'Проверьте, что `?{query}` с курсорной пагинацией '
+                'возвращает 400, а не результаты в другом порядке'
+            )
+
+
+class Test10CountCache:
+
+    @staticmethod
+    def get_with_queries(client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        counts = [
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        return response.json(), counts
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_count_cached_and_invalidated(self, client):
+        titles = fill_titles(3)
+        url = '/api/v1/titles/?genre=drama'
+        data, counts = self.get_with_queries(client, url)
+        assert data['count'] == 3 and len(counts) == 1
+        data, counts = self.get_with_queries(client, f'{url}&page=1')
+        assert data['count'] == 3 and not counts, (
+            'Проверьте, что количество записей берётся из кэша при повторном запросе'
+        )
+        titles[0].genre.clear()
+        data, counts = self.get_with_queries(client, url)
+        assert data['count'] == 2 and len(counts) == 1, (
+            'Проверьте, что кэш количества записей сбрасывается при изменении данных'
+        )
+        data, counts = self.get_with_queries(client, '/api/v1/titles/')
+        assert data['count'] == 3, (
+            'Проверьте, что количество кэшируется отдельно для каждого фильтра'
+        )
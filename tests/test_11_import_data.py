@@ -0,0 +1,211 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_PATH, filename), encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+class Test11ImportData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_data(self, django_user_model):
+        from reviews.models import Comment, Review, Title
+        out = StringIO()
+        call_command('import_data', '--batch-size', '7', stdout=out)
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда `import_data` выводит скорость импорта'
+        )
+        expected = {
+            django_user_model: 'users.csv',
+            Title: 'titles.csv',
+            Title.genre.through: 'genre_title.csv',
+            Review: 'review.csv',
+            Comment: 'comments.csv',
+        }
+        for model, filename in expected.items():
+            assert model.objects.count() == len(csv_rows(filename)), (
+                f'Проверьте, что команда `import_data` импортирует все строки `{filename}`'
+            )
+        row = csv_rows('titles.csv')[0]
+        title = Title.objects.get(pk=row['id'])
+        assert title.category_id == int(row['category']), (
+            'Проверьте, что команда `import_data` сохраняет категорию произведения'
+        )
+        row = csv_rows('comments.csv')[0]
+        comment = Comment.objects.get(pk=row['id'])
+        assert comment.review_id == int(row['review_id']), (
+            'Проверьте, что команда `import_data` сохраняет отзыв комментария'
+        )
+        assert comment.pub_date.isoformat().startswith(row['pub_date'][:19]), (
+            'Проверьте, что команда `import_data` сохраняет дату публикации из файла'
+        )
+        call_command('rebuild_ratings', '--check', stdout=out)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_import_data_is_idempotent(self):
+        from reviews.models import Review
+        call_command('import_data', stdout=StringIO())
+        count = Review.objects.count()
+        out = StringIO()
+        call_command('import_data', stdout=out)
+        assert Review.objects.count() == count
+        assert 'импортировано 0 записей' in out.getvalue()
+
+    def test_03_import_stages(self):
+        from reviews.datasets import TABLES
+        from reviews.importers import CsvImporter
+        stages = [
+            sorted(str(table) for table in stage)
+            for stage in CsvImporter.stages(TABLES)
+        ]
+        assert stages == [
+            ['category.csv', 'genre.csv', 'users.csv'],
+            ['titles.csv'],
+            ['genre_title.csv', 'review.csv'],
+            ['comments.csv'],
+        ], (
+            'Проверьте, что таблицы импортируются в порядке зависимостей'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_upsert_and_diff_modes(self, tmp_path):
+        import shutil
+        from reviews.models import Review, Title
+        for filename in os.listdir(DATA_PATH):
+            shutil.copy(os.path.join(DATA_PATH, filename), tmp_path)
+        call_command('import_data', '--path', str(tmp_path), stdout=StringIO())
+
+        reviews = csv_rows('review.csv')
+        changed = dict(reviews[0], score='1')
+        removed = reviews[1]
+        with open(tmp_path / 'review.csv', 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(changed))
+            writer.writeheader()
+            writer.writerow(changed)
+            writer.writerows(reviews[2:])
+
+        call_command('import_data', '--path', str(tmp_path), stdout=StringIO())
+        assert Review.objects.get(pk=changed['id']).score != 1, (
+            'Проверьте, что режим `insert` не изменяет существующие строки'
+        )
+        out = StringIO()
+        call_command(
+            'import_data', '--path', str(tmp_path), '--mode', 'upsert', stdout=out
+        )
+        assert Review.objects.get(pk=changed['id']).score == 1, (
+            'Проверьте, что режим `upsert` обновляет изменившиеся строки'
+        )
+        assert 'review.csv: импортировано 0 записей, обновлено 1' in out.getvalue()
+        assert Review.objects.filter(pk=removed['id']).exists()
+
+        call_command(
+            'import_data', '--path', str(tmp_path), '--mode', 'diff', stdout=StringIO()
+        )
+        assert not Review.objects.filter(pk=removed['id']).exists(), (
+            'Проверьте, что режим `diff` удаляет строки, отсутствующие в файле'
+        )
+        assert Review.objects.count() == len(reviews) - 1
+        title = Title.objects.get(pk=changed['title_id'])
+        assert title.review_count == Review.objects.filter(title=title).count()
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_export_round_trip(self, tmp_path, django_user_model):
+        import json
+        from reviews.models import Category, Comment, Genre, Review, Title
+        call_command('import_data', stdout=StringIO())
+        Title.objects.filter(pk__in=[1, 2]).update(
+            description='Описание, с запятой\nи переводом строки'
+        )
+        models = (django_user_model, Category, Genre, Title, Review, Comment)
+        snapshot = {
+            model: list(model.objects.order_by('pk').values())
+            for model in models
+        }
+        call_command('export_data', '--path', str(tmp_path), stdout=StringIO())
+        for filename in os.listdir(DATA_PATH):
+            with open(tmp_path / filename, encoding='utf-8') as file:
+                header = next(csv.reader(file))
+            if filename == 'titles.csv':
+                assert header.pop() == 'description', (
+                    'Проверьте, что `export_data` выгружает описания '
+                    'произведений'
+                )
+            assert header == list(csv_rows(filename)[0]), (
+                f'Проверьте, что `export_data` сохраняет колонки `{filename}`'
+            )
+        for model in reversed(models):
+            model.objects.all().delete()
+        call_command('import_data', '--path', str(tmp_path), stdout=StringIO())
+        for model in models:
+            rows = list(model.objects.order_by('pk').values())
+            for row in rows + snapshot[model]:
+                row.pop('date_joined', None)
+                row.pop('password', None)
+            assert rows == snapshot[model], (
+                f'Проверьте, что выгрузка `export_data` {model.__name__} '
+                'повторно загружается `import_data` без изменений'
+            )
+        call_command('import_data', '--mode', 'upsert', stdout=StringIO())
+        assert list(Title.objects.order_by('pk').values()) == snapshot[Title], (
+            'Проверьте, что режим `upsert` не стирает описания произведений, '
+            'если в файле нет колонки `description`'
+        )
+        ndjson_path = tmp_path / 'ndjson'
+        call_command(
+            'export_data', 'review.csv', '--path', str(ndjson_path),
+            '--format', 'ndjson', '--chunk-size', '10', stdout=StringIO()
+        )
+        with open(ndjson_path / 'review.ndjson', encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        assert len(records) == Review.objects.count()
+        assert list(records[0]) == list(csv_rows('review.csv')[0])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_diff_keeps_invalid_rows(self, tmp_path):
+        import shutil
+        from reviews.models import Review, Title
+        for filename in os.listdir(DATA_PATH):
+            shutil.copy(os.path.join(DATA_PATH, filename), tmp_path)
+        call_command('import_data', '--path', str(tmp_path), stdout=StringIO())
+        reviews = Review.objects.count()
+
+        titles = csv_rows('titles.csv')
+        broken = dict(titles[0], year='19x4')
+        with open(tmp_path / 'titles.csv', 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(broken))
+            writer.writeheader()
+            writer.writerow(broken)
+            writer.writerows(titles[1:])
+        call_command(
+            'import_data', '--path', str(tmp_path), '--mode', 'diff', stdout=StringIO()
+        )
+        assert Title.objects.filter(pk=broken['id']).exists(), (
+            'Проверьте, что режим `diff` не удаляет строки, которые есть в '
+            'файле, но содержат ошибки'
+        )
+        assert Review.objects.count() == reviews
+
+        broken = dict(titles[0], id='x')
+        with open(tmp_path / 'titles.csv', 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(broken))
+            writer.writeheader()
+            writer.writerow(broken)
+            writer.writerows(titles[2:])
+        call_command(
+            'import_data', '--path', str(tmp_path), '--mode', 'diff', stdout=StringIO()
+        )
+        assert Title.objects.count() == len(titles), (
+            'Проверьте, что при строке без корректного id режим `diff` '
+            'ничего не удаляет'
+        )
@@ -0,0 +1,99 @@
+import pytest
+
+from .common import create_categories, create_titles
+
+
+@pytest.fixture(params=['fts5', 'python'])
+def search_backend(request, settings):
+    from reviews import search
+    settings.SEARCH_BACKEND = request.param
+    search._backend = None
+    yield request.param
+    search._backend = None
+
+
+class Test12Search:
+
+    @staticmethod
+    def names(response):
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_ranked_search(self, search_backend, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        data = {'name': 'Драма без названия', 'year': 2001, 'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'], 'description': 'Просто фильм'}
+        admin_client.post('/api/v1/titles/', data=data)
+        names = self.names(admin_client.get('/api/v1/titles/?name=драм'))
+        assert names == ['Драма без названия', 'Проект'], (
+            'Проверьте, что `?name=` ищет по названию и описанию и '
+            'ставит совпадения в названии выше'
+        )
+        names = self.names(admin_client.get('/api/v1/titles/?name=поворот туда'))
+        assert names == ['Поворот туда'], (
+            'Проверьте, что `?name=` находит произведения, содержащие все слова запроса'
+        )
+        assert self.names(admin_client.get('/api/v1/titles/?name=ничего')) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_follows_changes(self, search_backend, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'name': 'Переименовано', 'category': titles[1]['category']}
+        )
+        assert self.names(admin_client.get('/api/v1/titles/?name=проект')) == []
+        assert self.names(
+            admin_client.get('/api/v1/titles/?name=переименовано')
+        ) == ['Переименовано']
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert self.names(admin_client.get('/api/v1/titles/?name=переименовано')) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_categories_and_genres_search(self, search_backend, admin_client):
+        create_categories(admin_client)
+        assert self.names(admin_client.get('/api/v1/categories/?search=кни')) == ['Книги']
+        admin_client.delete('/api/v1/categories/books/')
+        assert self.names(admin_client.get('/api/v1/categories/?search=кни')) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_fts_table_survives_rollback(self, settings, admin_client):
+        from django.db import connection, transaction
+        from reviews import search
+        from reviews.models import Title
+        settings.SEARCH_BACKEND = 'fts5'
+        search._backend = None
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS reviews_title_fts')
+        with pytest.raises(RuntimeError), transaction.atomic():
+            Title.objects.create(name='Откат', year=2000)
+            assert search.search_queryset(Title.objects.all(), 'откат')
+            raise RuntimeError
+        Title.objects.create(name='После отката', year=2000)
+        assert self.names(admin_client.get('/api/v1/titles/?name=отката')) == [
+            'После отката'
+        ], (
+            'Проверьте, что таблица FTS5, созданная в откатившейся '
+            'транзакции, создаётся заново'
+        )
+        search._backend = None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_results_not_capped(self, search_backend, client, monkeypatch):
+        from reviews import search
+        from reviews.models import Title
+        monkeypatch.setattr(search, 'MAX_RESULTS', 2)
+        for i in range(3):
+            Title.objects.create(name=f'Сага {i}', year=2000)
+        response = client.get('/api/v1/titles/?name=сага')
+        if search_backend == 'python':
+            assert response.status_code == 400, (
+                'Проверьте, что слишком общий запрос отклоняется, а не '
+                'обрезается'
+            )
+            return
+        assert response.json()['count'] == 3, (
+            'Проверьте, что количество результатов поиска не ограничено'
+        )
+        assert self.names(response) == ['Сага 0', 'Сага 1', 'Сага 2']
@@ -0,0 +1,103 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test13TitleFilters:
+
+    @staticmethod
+    def names(client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return sorted(item['name'] for item in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_exact_slug_filters(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, '/api/v1/titles/?genre=horror') == ['Поворот туда']
+        assert self.names(client, '/api/v1/titles/?genre=hor') == [], (
+            'Проверьте, что `?genre=` сравнивает slug жанра точно'
+        )
+        assert self.names(client, '/api/v1/titles/?genre=horror,drama') == [
+            'Поворот туда', 'Проект'
+        ], 'Проверьте, что `?genre=` принимает несколько slug через запятую'
+        assert self.names(client, '/api/v1/titles/?genre=horror,comedy') == [
+            'Поворот туда'
+        ], 'Проверьте, что `?genre=` не дублирует произведения'
+        assert self.names(client, '/api/v1/titles/?category=books') == ['Проект']
+        assert self.names(client, '/api/v1/titles/?category=book') == []
+        assert self.names(client, '/api/v1/titles/?category=unknown') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_icontains_opt_in(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, '/api/v1/titles/?genre__icontains=o') == [
+            'Поворот туда'
+        ]
+        assert self.names(client, '/api/v1/titles/?category__icontains=book') == ['Проект']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_slug_map_follows_changes(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, '/api/v1/titles/?category=books') == ['Проект']
+        admin_client.delete('/api/v1/categories/books/')
+        admin_client.post('/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'})
+        assert self.names(client, '/api/v1/titles/?category=books') == [], (
+            'Проверьте, что словарь slug категорий обновляется при изменении категорий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_ranges_and_ordering(self, client, admin_client, admin):
+        from .common import create_reviews
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Шедевр', 'score': 9}
+        )
+        assert self.names(client, '/api/v1/titles/?year_min=2001') == ['Проект']
+        assert self.names(client, '/api/v1/titles/?year_max=2000') == ['Поворот туда']
+        assert self.names(client, '/api/v1/titles/?year_min=2000&year_max=2020') == [
+            'Поворот туда', 'Проект'
+        ]
+        assert self.names(client, '/api/v1/titles/?rating_min=5') == ['Проект'], (
+            'Проверьте, что `?rating_min=` фильтрует по рейтингу'
+        )
+        assert self.names(client, '/api/v1/titles/?rating_max=4') == ['Поворот туда']
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        assert [item['rating'] for item in response.json()['results']] == [9, 4], (
+            'Проверьте, что `?ordering=-rating` сортирует по убыванию рейтинга'
+        )
+        response = client.get('/api/v1/titles/?ordering=year')
+        assert [item['year'] for item in response.json()['results']] == [2000, 2020]
+        response = client.get('/api/v1/titles/?genre=drama&year_min=2000&ordering=-rating')
+        assert [item['name'] for item in response.json()['results']] == ['Проект']
+        response = client.get('/api/v1/titles/?ordering=description')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_unrated_titles_last(self, client, admin_client, admin):
+        from api.filters import StableOrderingFilter
+        from reviews.models import Title
+
+        from .common import create_reviews
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Шедевр', 'score': 9}
+        )
+        Title.objects.create(name='Без отзывов', year=2010)
+        for ordering, ratings in (('-rating', [9, 4]), ('rating', [4, 9])):
+            response = client.get(f'/api/v1/titles/?ordering={ordering}')
+            assert [
+                item['rating'] for item in response.json()['results']
+            ] == ratings + [None], (
+                'Проверьте, что произведения без рейтинга идут в конце при '
+                'сортировке по рейтингу'
+            )
+        qs = StableOrderingFilter().filter(Title.objects.all(), ['-rating'])
+        assert qs.query.order_by[0].nulls_last, (
+            'Проверьте, что порядок NULL задан явно и одинаков в SQLite и '
+            'PostgreSQL'
+        )
@@ -0,0 +1,154 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+
+def conditional_get(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    return response, len(context)
+
+
+class Test14ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_list_not_modified(self, client):
+        titles = fill_titles(2)
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            'Проверьте, что список произведений отдаёт заголовки '
+            '`ETag` и `Last-Modified`'
+        )
+        response, queries = conditional_get(
+            client, url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304 and queries == 0, (
+            'Проверьте, что при совпадающем `If-None-Match` возвращается '
+            '304 без запросов к БД'
+        )
+        assert response['ETag'] == etag
+        response = client.get(f'{url}?year=2000', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что `ETag` зависит от параметров запроса'
+        )
+        titles[0].genre.clear()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что `ETag` меняется при изменении данных'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_detail_per_object(self, client):
+        from reviews.models import Category
+        first, second = fill_titles(2)
+        url = f'/api/v1/titles/{first.pk}/'
+        etag = client.get(url)['ETag']
+        second.name = 'Другое название'
+        second.save()
+        response, queries = conditional_get(
+            client, url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304 and queries == 0, (
+            'Проверьте, что `ETag` произведения не меняется при изменении '
+            'других произведений'
+        )
+        first.name = 'Новое название'
+        first.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что `ETag` произведения меняется при его изменении'
+        )
+        etag = response['ETag']
+        Category.objects.filter(slug='films').update(name='Кино')
+        Category.objects.get(slug='films').save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['category']['name'] == 'Кино', (
+            'Проверьте, что `ETag` произведения учитывает изменения категорий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reviews_and_modified_since(self, client, user_client, user):
+        title = fill_titles(1)[0]
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            'Проверьте, что при `If-Modified-Since` не раньше `Last-Modified` '
+            'возвращается 304'
+        )
+        etag = response['ETag']
+        response = user_client.post(url, data={'text': 'Текст', 'score': 7})
+        assert response.status_code == 201
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['count'] == 1, (
+            'Проверьте, что новый отзыв меняет `ETag` списка отзывов'
+        )
+        response = client.get(
+            f'/api/v1/titles/{title.pk + 100}/reviews/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_review_detail_follows_title(self, client, user):
+        from reviews.models import Review
+        title = fill_titles(1)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=7
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        etag = client.get(url)['ETag']
+        title.name = 'Новое название'
+        title.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что `ETag` отзыва меняется при переименовании '
+            'произведения'
+        )
+        assert response.json()['title'] == 'Новое название'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_comments_follow_review(self, client, user):
+        from reviews.models import Review
+        title = fill_titles(1)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=7
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        etag = client.get(url)['ETag']
+        review.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404, (
+            'Проверьте, что после удаления отзыва список его комментариев '
+            'возвращает 404, а не 304'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_versions_bumped_on_commit(self):
+        from django.db import transaction
+        from reviews.models import Genre
+        from reviews.versions import model_versions
+        before = model_versions(Genre)
+        with transaction.atomic():
+            Genre.objects.create(name='Драма', slug='drama')
+            assert model_versions(Genre) == before, (
+                'Проверьте, что версия данных меняется только после '
+                'фиксации транзакции'
+            )
+        after = model_versions(Genre)
+        assert after > before
+        try:
+            with transaction.atomic():
+                Genre.objects.create(name='Комедия', slug='comedy')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert model_versions(Genre) == after, (
+            'Проверьте, что откат транзакции не меняет версию данных'
+        )
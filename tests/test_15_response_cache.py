@@ -0,0 +1,119 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+REDIS_CACHES = {
+    'default': {
+        'BACKEND': 'api_yamdb.redis_cache.RedisCache',
+        'LOCATION': 'redis://test/0',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'api_yamdb.redis_cache.LocalRedisClient',
+        },
+    },
+}
+
+
+def get_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+    )
+    return response.json(), len(context)
+
+
+@pytest.fixture(params=['locmem', 'redis'])
+def cache_backend(request, settings):
+    if request.param == 'redis':
+        settings.CACHES = REDIS_CACHES
+    cache.clear()
+    yield request.param
+    cache.clear()
+
+
+class Test15ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_anonymous_responses_cached(self, cache_backend, client,
+                                           admin_client):
+        titles = fill_titles(2)
+        url = '/api/v1/titles/'
+        data, _ = get_queries(client, url)
+        cached, queries = get_queries(client, url)
+        assert cached == data and queries == 0, (
+            'Проверьте, что повторный анонимный GET запрос отдаётся из кэша '
+            'без запросов к БД'
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0].pk}/',
+            data={'name': 'Новое название', 'category': 'films'}
+        )
+        assert response.status_code == 200
+        data, queries = get_queries(client, url)
+        assert queries and 'Новое название' in [
+            title['name'] for title in data['results']
+        ], 'Проверьте, что изменение произведения сбрасывает кэш ответов'
+        _, queries = get_queries(client, '/api/v1/categories/')
+        _, queries = get_queries(client, '/api/v1/categories/')
+        assert queries == 0
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        data, queries = get_queries(client, '/api/v1/categories/')
+        assert data['count'] == 2, (
+            'Проверьте, что новая категория сбрасывает кэш ответов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_nested_and_authenticated(self, cache_backend, client,
+                                         user_client):
+        title = fill_titles(1)[0]
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        get_queries(client, url)
+        _, queries = get_queries(client, url)
+        assert queries == 0
+        user_client.post(url, data={'text': 'Текст', 'score': 8})
+        data, _ = get_queries(client, url)
+        assert data['count'] == 1, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка отзывов'
+        )
+        get_queries(user_client, url)
+        _, queries = get_queries(user_client, url)
+        assert queries, (
+            'Проверьте, что ответы авторизованным пользователям не кэшируются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_deleted_parent(self, cache_backend, client, user):
+        from reviews.models import Review
+        title = fill_titles(1)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=7
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        get_queries(client, url)
+        review.delete()
+        response = client.get(url)
+        assert response.status_code == 404, (
+            'Проверьте, что после удаления отзыва закэшированный список его '
+            'комментариев не отдаётся'
+        )
+
+    def test_04_redis_backend(self, settings):
+        settings.CACHES = REDIS_CACHES
+        cache.clear()
+        cache.set('key', {'value': 1})
+        assert cache.get('key') == {'value': 1}
+        assert not cache.add('key', 2) and cache.add('other', 2)
+        assert cache.get_many(['key', 'other', 'missing']) == {
+            'key': {'value': 1}, 'other': 2
+        }
+        cache.set('short', 1, 0)
+        assert cache.get('short') is None
+        cache.delete('key')
+        assert not cache.has_key('key')
+        cache.clear()
+        assert cache.get('other') is None
@@ -0,0 +1,129 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+CATALOG_TABLES = re.compile(r'"reviews_(category|genre)"')
+SLUG_LOOKUP = re.compile(r'WHERE .*"reviews_(category|genre)"\."slug"')
+
+
+def catalog_queries(callback, pattern=CATALOG_TABLES):
+    with CaptureQueriesContext(connection) as context:
+        response = callback()
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if pattern.search(query['sql'])
+    ]
+
+
+class Test16Catalog:
+
+    @pytest.fixture(autouse=True)
+    def no_response_cache(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_read_without_catalog_queries(self, client):
+        title = fill_titles(1)[0]
+        client.get('/api/v1/titles/')
+        response, queries = catalog_queries(
+            lambda: client.get('/api/v1/titles/?genre=drama&category=films')
+        )
+        assert response.status_code == 200 and not queries, (
+            'Проверьте, что категории и жанры произведений берутся из '
+            'справочника без запросов к их таблицам'
+        )
+        data = response.json()['results'][0]
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert data['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ], 'Проверьте, что жанры произведения упорядочены по названию'
+        response, queries = catalog_queries(
+            lambda: client.get(f'/api/v1/titles/{title.pk}/')
+        )
+        assert response.json() == data and not queries
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_write_and_invalidation(self, admin_client):
+        fill_titles(1)
+        admin_client.get('/api/v1/titles/')
+        data = {
+            'name': 'Новое', 'year': 2010, 'category': 'films',
+            'genre': ['drama', 'comedy']
+        }
+        response, queries = catalog_queries(
+            lambda: admin_client.post('/api/v1/titles/', data=data),
+            SLUG_LOOKUP
+        )
+        assert response.status_code == 201 and not queries, (
+            'Проверьте, что slug категории и жанров при создании '
+            'произведения проверяются по справочнику'
+        )
+        response = admin_client.post(
+            '/api/v1/titles/', data={**data, 'name': 'Ещё', 'genre': ['nope']}
+        )
+        assert response.status_code == 400 and 'genre' in response.json()
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'}
+        )
+        response = admin_client.post(
+            '/api/v1/titles/',
+            data={**data, 'name': 'Ещё', 'genre': ['horror']}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что справочник обновляется после добавления жанра'
+        )
+        response = admin_client.get('/api/v1/titles/?genre=horror')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Ещё'
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_changes_from_other_process(self, admin_client, settings):
+        from django.core.cache import cache
+        from reviews.models import Category, Genre
+        from reviews.versions import version_key
+        fill_titles(1)
+        admin_client.get('/api/v1/titles/')
+        keys = [version_key(Category), version_key(Genre)]
+        versions = cache.get_many(keys)
+
+        def in_other_process(callback):
+            # С кэшем в памяти процесса этот процесс не видит версий,
+            # увеличенных другим процессом.
+            callback()
+            cache.set_many(versions, None)
+
+        in_other_process(
+            lambda: Genre.objects.create(name='Ужасы', slug='horror')
+        )
+        data = {
+            'name': 'Новое', 'year': 2010, 'category': 'films',
+            'genre': ['horror']
+        }
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что жанр, созданный в другом процессе, сразу '
+            'доступен при создании произведения'
+        )
+        response = admin_client.get('/api/v1/titles/?genre=horror')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что фильтр находит жанр, созданный в другом процессе'
+        )
+        assert response.json()['results'][0]['genre'] == [
+            {'name': 'Ужасы', 'slug': 'horror'}
+        ]
+
+        settings.CATALOG_TIMEOUT = 0
+        in_other_process(
+            lambda: Category.objects.filter(slug='films').update(name='Кино')
+        )
+        response = admin_client.get('/api/v1/titles/?genre=horror')
+        assert response.json()['results'][0]['category']['name'] == 'Кино', (
+            'Проверьте, что справочник перечитывается по истечении '
+            '`CATALOG_TIMEOUT`'
+        )
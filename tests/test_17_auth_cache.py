@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_customuser"' in query['sql']
+    ]
+
+
+class Test17AuthUserCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_user_cached(self, user_client, user):
+        url = '/api/v1/titles/'
+        response, queries = user_queries(user_client, url)
+        assert response.status_code == 200 and len(queries) == 1
+        response, queries = user_queries(user_client, url)
+        assert response.status_code == 200 and not queries, (
+            'Проверьте, что пользователь из JWT берётся из кэша без '
+            'запроса к БД'
+        )
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что профиль загружается полностью'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_invalidates(self, admin_client, user):
+        client = auth_client(user)
+        data = {'name': 'Книги', 'slug': 'books'}
+        assert client.get('/api/v1/users/me/').status_code == 200
+        response = client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        response = client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что смена роли пользователя действует сразу, '
+            'несмотря на кэш'
+        )
+        user.refresh_from_db()
+        user.is_active = False
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что заблокированный пользователь сразу теряет доступ'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cache_holds_no_secrets(self, user_client, user):
+        from django.core.cache import cache
+        user_client.get('/api/v1/titles/')
+        cached = [
+            cache.get(key.split(':', 2)[2]) for key in list(cache._cache)
+            if ':auth-user:' in key
+        ]
+        assert cached == [{
+            'username': user.username, 'role': user.role,
+            'is_staff': False, 'is_superuser': False, 'is_active': True,
+        }], (
+            'Проверьте, что в кэше хранятся только поля, нужные для '
+            'проверки прав, без хеша пароля'
+        )
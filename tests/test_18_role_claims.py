@@ -0,0 +1,127 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .test_09_queries import fill_titles
+
+
+def claims_client(user):
+    client = APIClient()
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 200
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client
+
+
+def user_queries(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_customuser"' in query['sql']
+    ]
+
+
+class Test18RoleClaims:
+
+    @pytest.fixture(autouse=True)
+    def role_claims(self, settings):
+        settings.JWT_ROLE_CLAIMS = True
+        settings.AUTH_USER_CACHE_TIMEOUT = 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_permissions_from_claims(self, user, admin):
+        title = fill_titles(1)[0]
+        client = claims_client(user)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        client.get(url)
+        response, queries = user_queries(
+            client, 'post', url, data={'text': 'Текст', 'score': 9}
+        )
+        assert response.status_code == 201 and not queries, (
+            'Проверьте, что в режиме `JWT_ROLE_CLAIMS` пользователь '
+            'собирается из токена без запроса к БД'
+        )
+        assert response.json()['author'] == user.username
+        response = client.patch(
+            f'{url}{response.json()["id"]}/', data={'text': 'Новый текст'}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменить свой отзыв'
+        )
+        response = claims_client(admin).post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == 201
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `users/me` возвращает полный профиль'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_revocation(self, admin_client, user):
+        client = claims_client(user)
+        data = {'name': 'Книги', 'slug': 'books'}
+        response = client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        response = client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 401, (
+            'Проверьте, что смена роли отзывает токены с прежней ролью'
+        )
+        client = claims_client(user)
+        response = client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 201
+        user.refresh_from_db()
+        user.revoke_tokens()
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 401, (
+            'Проверьте, что `revoke_tokens` отзывает выданные токены'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_token_version_cache_expires(self, user, settings):
+        from django.core.cache import cache
+        settings.JWT_TOKEN_VERSION_CACHE_TIMEOUT = 30
+        claims_client(user).get('/api/v1/titles/')
+        expires = [
+            cache._expire_info[key] for key in list(cache._cache)
+            if ':token-version:' in key
+        ]
+        assert len(expires) == 1 and expires[0] is not None, (
+            'Проверьте, что версия токенов кэшируется на ограниченное время'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_import_revokes_tokens(self, admin_client, django_user_model,
+                                      settings, tmp_path):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        settings.IMPORT_JOBS_IN_THREAD = False
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        demoted = django_user_model.objects.create_user(
+            username='demoted', email='demoted@yamdb.fake', role='admin'
+        )
+        client = claims_client(demoted)
+        assert client.get('/api/v1/users/').status_code == 200
+        content = (
+            'id,username,email,role,bio,first_name,last_name\n'
+            f'{demoted.pk},demoted,demoted@yamdb.fake,user,,,\n'
+        ).encode()
+        response = admin_client.post('/api/v1/imports/', data={
+            'table': 'users',
+            'mode': 'upsert',
+            'file': SimpleUploadedFile('users.csv', content),
+        })
+        assert response.json()['updated'] == 1
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что смена роли при импорте отзывает токены с '
+            'прежней ролью'
+        )
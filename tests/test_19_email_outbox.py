@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FailingBackend:
+    """Почтовый бэкенд, который не может отправить ни одного письма."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableBackend(FailingBackend):
+    """Почтовый бэкенд, к серверу которого нельзя подключиться."""
+
+    def open(self):
+        raise ConnectionRefusedError('Соединение отклонено')
+
+
+class StopLoop(Exception):
+    pass
+
+
+class Test19EmailOutbox:
+
+    @pytest.fixture(autouse=True)
+    def use_outbox(self, settings):
+        settings.EMAIL_USE_OUTBOX = True
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client):
+        from users.models import OutgoingEmail
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200 and response.json() == data
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при `EMAIL_USE_OUTBOX` письмо не отправляется '
+            'во время запроса'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient=data['email'], sent_at__isnull=True
+        ).count() == 1
+        call_command('send_queued_emails')
+        assert len(mail.outbox) == 1 and mail.outbox[0].to == [data['email']], (
+            'Проверьте, что `send_queued_emails` отправляет письма из очереди'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+        call_command('send_queued_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленные письма не отправляются повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import send_batch, send_or_queue
+        send_or_queue('Тема', 'Текст', 'noreply@yamdb.fake', ['a@yamdb.fake'])
+        settings.EMAIL_BACKEND = (
+            'tests.test_19_email_outbox.FailingBackend'
+        )
+        assert send_batch() == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and 'SMTP' in email.last_error
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        assert send_batch() == (0, 0)
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutgoingEmail.objects.update(
+            send_after=timezone.now() - timedelta(seconds=1)
+        )
+        assert send_batch() == (1, 0) and len(mail.outbox) == 1
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unreachable_server(self, settings, monkeypatch):
+        from io import StringIO
+        from users.management.commands import send_queued_emails
+        from users.models import OutgoingEmail
+        from users.outbox import send_or_queue
+        for i in range(3):
+            send_or_queue(
+                'Тема', 'Текст', 'noreply@yamdb.fake', [f'{i}@yamdb.fake']
+            )
+        settings.EMAIL_BACKEND = (
+            'tests.test_19_email_outbox.UnreachableBackend'
+        )
+        out = StringIO()
+        call_command('send_queued_emails', '--batch-size', '2', stdout=out)
+        assert 'ошибок: 2' in out.getvalue(), (
+            'Проверьте, что после ошибки соединения обработчик не '
+            'перебирает всю очередь'
+        )
+        emails = OutgoingEmail.objects.filter(attempts=1)
+        assert emails.count() == 2 and all(
+            'ConnectionRefusedError' in email.last_error
+            and email.send_after > timezone.now()
+            for email in emails
+        ), (
+            'Проверьте, что ошибка соединения засчитывается попыткой '
+            'отправки с отложенным повтором'
+        )
+
+        def broken_batch(*args):
+            raise RuntimeError('БД недоступна')
+
+        def stop(seconds):
+            raise StopLoop
+
+        monkeypatch.setattr(send_queued_emails, 'send_batch', broken_batch)
+        monkeypatch.setattr(send_queued_emails.time, 'sleep', stop)
+        err = StringIO()
+        with pytest.raises(StopLoop):
+            call_command('send_queued_emails', '--loop', stderr=err)
+        assert 'БД недоступна' in err.getvalue(), (
+            'Проверьте, что в режиме `--loop` ошибка не завершает обработчик'
+        )
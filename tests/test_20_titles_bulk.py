@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+URL = '/api/v1/titles/bulk/'
+
+
+class Test20TitlesBulk:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create_and_update(self, admin_client):
+        from reviews.models import Title
+        existing = fill_titles(1)[0]
+        admin_client.get('/api/v1/titles/')
+        items = [
+            {'name': f'Пакет {i}', 'year': 1990 + i, 'category': 'films',
+             'genre': ['drama', 'comedy'][:i % 2 + 1]}
+            for i in range(20)
+        ]
+        items.append({'id': existing.pk, 'name': 'Изменено',
+                      'genre': ['comedy']})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == 200, response.json()
+        data = response.json()
+        assert len(data['created']) == 20 and data['updated'] == [existing.pk]
+        assert data['errors'] == []
+        assert len(context) <= 12, (
+            'Проверьте, что пакетное сохранение выполняет постоянное '
+            f'количество запросов к БД, сейчас {len(context)}'
+        )
+        created = Title.objects.get(pk=data['created'][1])
+        assert created.name == 'Пакет 1' and sorted(
+            created.genre.values_list('slug', flat=True)
+        ) == ['comedy', 'drama'], (
+            'Проверьте, что жанры созданных произведений сохранены'
+        )
+        existing.refresh_from_db()
+        assert existing.name == 'Изменено' and existing.year == 2000
+        assert list(existing.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ]
+        response = admin_client.get('/api/v1/titles/?name=пакет')
+        assert response.json()['count'] == 20, (
+            'Проверьте, что созданные произведения попадают в поиск'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_per_item_errors(self, admin_client, user_client):
+        fill_titles(1)
+        items = [
+            {'name': 'Новое', 'year': 2001, 'category': 'films',
+             'genre': ['drama']},
+            {'name': 'Без жанра', 'year': 2001, 'category': 'nope',
+             'genre': ['nope']},
+            {'name': 'Произведение 0', 'year': 2001, 'category': 'films',
+             'genre': ['drama']},
+            {'name': 'Новое', 'year': 2002, 'category': 'films',
+             'genre': ['drama']},
+            {'id': 100500, 'name': 'Нет такого'},
+            'строка',
+        ]
+        response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['created']) == 1 and data['updated'] == []
+        errors = {error['index']: error['errors'] for error in data['errors']}
+        assert sorted(errors) == [1, 2, 3, 4, 5], (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+        assert {'category', 'genre'} <= set(errors[1])
+        response = admin_client.post(URL, data=items[1:3], format='json')
+        assert response.status_code == 400
+        response = user_client.post(URL, data=items[:1], format='json')
+        assert response.status_code == 403
+        response = admin_client.post(URL, data=items[0], format='json')
+        assert response.status_code == 400
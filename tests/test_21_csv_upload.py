@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from .test_11_import_data import DATA_PATH, csv_rows
+
+URL = '/api/v1/imports/'
+
+
+def upload(client, table, content=None, mode='insert'):
+    if content is None:
+        with open(os.path.join(DATA_PATH, f'{table}.csv'), 'rb') as file:
+            content = file.read()
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    return client.post(URL, data={
+        'table': table,
+        'mode': mode,
+        'file': SimpleUploadedFile(f'{table}.csv', content),
+    })
+
+
+class Test21CsvUpload:
+
+    @pytest.fixture(autouse=True)
+    def sync_jobs(self, settings, tmp_path):
+        settings.IMPORT_JOBS_IN_THREAD = False
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_upload_and_progress(self, admin_client, tmp_path):
+        from reviews.models import Title
+        response = upload(admin_client, 'category')
+        assert response.status_code == 202, (
+            f'Проверьте, что POST запрос `{URL}` с файлом возвращает статус 202'
+        )
+        assert admin_client.get(URL).json()['count'] == 1
+        response = upload(admin_client, 'titles')
+        assert response.status_code == 202
+        assert admin_client.get(URL).json()['count'] == 2, (
+            'Проверьте, что список задач импорта сразу показывает новые задачи'
+        )
+        job = response.json()
+        assert 'file' not in job and job['table'] == 'titles'
+        response = admin_client.get(f'{URL}{job["id"]}/')
+        assert response.status_code == 200
+        job = response.json()
+        rows = len(csv_rows('titles.csv'))
+        assert job['status'] == 'done' and job['processed'] == rows, (
+            'Проверьте, что задача импорта сообщает о ходе и завершении'
+        )
+        assert job['created'] == rows == Title.objects.count()
+        assert not os.listdir(tmp_path), (
+            'Проверьте, что загруженный файл удаляется после импорта'
+        )
+        response = admin_client.get('/api/v1/titles/?name=побег')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что после импорта обновляются поиск и кэши'
+        )
+        job = upload(admin_client, 'titles', mode='upsert').json()
+        assert job['skipped'] == rows and job['created'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_errors_and_permissions(self, admin_client, user_client):
+        response = upload(user_client, 'category')
+        assert response.status_code == 403
+        response = upload(admin_client, 'unknown', b'id\n1\n')
+        assert response.status_code == 400
+        job = upload(
+            admin_client, 'category', 'id,slug\n1,films\n'.encode()
+        ).json()
+        assert job['status'] == 'failed' and 'name' in job['error'], (
+            'Проверьте, что файл без нужных колонок завершает задачу с ошибкой'
+        )
+        job = upload(
+            admin_client, 'category',
+            'id,name,slug\n1,Фильм,films\nx,Книги,books\n2,Музыка\n'.encode()
+        ).json()
+        assert (job['status'], job['created'], job['invalid']) == (
+            'done', 1, 2
+        ), 'Проверьте, что некорректные строки пропускаются'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_writes_during_import(self, admin_client, user,
+                                         monkeypatch):
+        from reviews import importers
+        from reviews.models import Review
+
+        from .test_09_queries import fill_titles
+        title = fill_titles(1)[0]
+        insert_rows = importers.insert_rows
+        responses = []
+
+        def insert_with_request(*args, **kwargs):
+            # Запрос к API выполняется посреди записи пачки импорта.
+            responses.append(admin_client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                data={'text': 'Отзыв через API', 'score': 8}
+            ))
+            insert_rows(*args, **kwargs)
+
+        monkeypatch.setattr(importers, 'insert_rows', insert_with_request)
+        job = upload(admin_client, 'review', (
+            'id,title_id,text,author,score,pub_date\n'
+            f'100,{title.pk},Из файла,{user.pk},6,2020-01-02T03:04:05Z\n'
+        ).encode()).json()
+        assert job['status'] == 'done' and job['created'] == 1
+        assert responses[0].status_code == 201, (
+            'Проверьте, что импорт не мешает создавать отзывы через API'
+        )
+        assert Review.objects.get(pk=100).pub_date.year == 2020, (
+            'Проверьте, что импорт сохраняет дату публикации из файла'
+        )
+        assert Review.objects.exclude(pk=100).get().pub_date is not None
@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+
+from .test_09_queries import count_queries, fill_titles
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?pagination=cursor',
+    '/api/v1/titles/?name=Произведение',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/?pagination=cursor',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+)
+
+
+class Test22FastSerializers:
+
+    @pytest.fixture
+    def data(self, django_user_model):
+        from reviews.models import Comment, Review, Title
+        titles = fill_titles(12)
+        Title.objects.create(name='Без категории', year=1999)
+        title = titles[0]
+        for i in range(12):
+            author = django_user_model.objects.create_user(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text=f'Текст {i}', score=i % 10 + 1
+            )
+            Comment.objects.create(review=review, author=author, text='Да')
+        return {'title': title.pk, 'review': review.pk}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_identical_output(self, client, settings, data):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        for url in URLS:
+            url = url.format(**data)
+            settings.FAST_READ_SERIALIZERS = False
+            expected = client.get(url)
+            settings.FAST_READ_SERIALIZERS = True
+            response = client.get(url)
+            assert response.status_code == expected.status_code == 200
+            assert response.content == expected.content, (
+                f'Проверьте, что быстрая сериализация `{url}` даёт тот же '
+                'ответ, что и обычная'
+            )
+            assert count_queries(client, url, warm=True) <= 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_benchmark_command(self, data, capsys):
+        call_command('benchmark_serializers', '--repeat', '2')
+        output = capsys.readouterr().out
+        assert 'titles' in output and 'ускорение' in output
@@ -0,0 +1,99 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+
+def get_with_queries(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+    )
+    return response.json(), [query['sql'] for query in context]
+
+
+class Test23SparseFields:
+
+    @pytest.fixture(autouse=True)
+    def no_response_cache(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_fields(self, client):
+        fill_titles(3)
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert set(data['results'][0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля произведения'
+        )
+        assert not any('"description"' in sql for sql in queries), (
+            'Проверьте, что невыбранные столбцы произведения не загружаются'
+        )
+        assert not any('reviews_title_genre' in sql for sql in queries), (
+            'Проверьте, что жанры не загружаются, если они не выбраны'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_omit(self, client, settings):
+        title = fill_titles(1)[0]
+        url = f'/api/v1/titles/{title.pk}/?omit=description,genre'
+        data, queries = get_with_queries(client, url)
+        assert set(data) == {'id', 'name', 'year', 'rating', 'category'}, (
+            'Проверьте, что `?omit=` убирает поля из ответа'
+        )
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert len(queries) == 1
+
+        for fast in (False, True):
+            settings.FAST_READ_SERIALIZERS = fast
+            response = client.get('/api/v1/titles/?omit=description,genre')
+            assert response.json()['results'][0] == data, (
+                'Проверьте, что `?omit=` одинаково работает для списка и '
+                'объекта при любом способе сериализации'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reviews_fields(self, client, user):
+        from reviews.models import Review
+        title = fill_titles(1)[0]
+        Review.objects.create(title=title, author=user, text='Текст', score=7)
+        url = f'/api/v1/titles/{title.pk}/reviews/?fields=id,score'
+        data, queries = get_with_queries(client, url)
+        assert set(data['results'][0]) == {'id', 'score'}
+        review_query = queries[-1]
+        assert 'JOIN' not in review_query and '"text"' not in review_query, (
+            'Проверьте, что для невыбранных полей отзыва не загружаются '
+            'столбцы и не соединяются таблицы'
+        )
+
+        data, queries = get_with_queries(client, url + ',author')
+        assert data['results'][0]['author'] == user.username
+        assert 'JOIN' in queries[-1]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_users_fields(self, admin_client, admin):
+        data, queries = get_with_queries(
+            admin_client, '/api/v1/users/?fields=username,role'
+        )
+        assert data['results'] == [{'username': admin.username,
+                                    'role': admin.role}]
+        assert not any('"bio"' in sql for sql in queries)
+
+        response = admin_client.get('/api/v1/users/me/?omit=bio,email')
+        assert set(response.json()) == {
+            'username', 'first_name', 'last_name', 'role'
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_unknown_field(self, client):
+        fill_titles(1)
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `?fields=` возвращает 400'
+        )
+        assert 'fields' in response.json()
@@ -0,0 +1,122 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .test_09_queries import fill_titles
+
+
+def make_reviews(title, django_user_model, count, comments, prefix='author'):
+    from reviews.models import Comment, Review
+    reviews = []
+    for i in range(count):
+        author = django_user_model.objects.create_user(
+            username=f'{prefix}{i}', email=f'{prefix}{i}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {i}', score=i % 10 + 1
+        )
+        for j in range(comments):
+            Comment.objects.create(
+                review=review, author=author, text=f'Комментарий {i}-{j}'
+            )
+        reviews.append(review)
+    return reviews
+
+
+def count_expand_queries(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+    )
+    return response.json(), len(context)
+
+
+class Test24Expand:
+
+    @pytest.fixture(autouse=True)
+    def no_response_cache(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_expand_reviews_and_comments(self, client, django_user_model):
+        title = fill_titles(1)[0]
+        make_reviews(title, django_user_model, 4, 5)
+        url = (f'/api/v1/titles/{title.pk}/?expand=reviews.comments'
+               f'&reviews_limit=3&comments_limit=2')
+        data, queries = count_expand_queries(client, url)
+        assert data['name'] == title.name
+        assert len(data['reviews']) == 3, (
+            'Проверьте, что `reviews_limit` ограничивает количество '
+            'встроенных отзывов'
+        )
+        review = data['reviews'][0]
+        assert review == {
+            **client.get(
+                f'/api/v1/titles/{title.pk}/reviews/{review["id"]}/'
+            ).json(),
+            'comments': review['comments'],
+        }, (
+            'Проверьте, что встроенный отзыв совпадает с ответом '
+            '`/reviews/{id}/`'
+        )
+        expected = client.get(
+            f'/api/v1/titles/{title.pk}/reviews/{review["id"]}/comments/'
+        ).json()['results'][:2]
+        assert review['comments'] == expected, (
+            'Проверьте, что встроены последние комментарии отзыва в порядке '
+            'списка комментариев'
+        )
+        assert queries <= 4
+
+        from reviews.models import Title
+        other = Title.objects.create(name='Другое', year=2001)
+        make_reviews(other, django_user_model, 1, 1, prefix='other')
+        _, few_queries = count_expand_queries(
+            client, url.replace(f'/titles/{title.pk}/', f'/titles/{other.pk}/')
+        )
+        assert few_queries == queries, (
+            'Проверьте, что количество запросов не зависит от количества '
+            'отзывов и комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_expand_reviews_only(self, client, django_user_model):
+        title = fill_titles(1)[0]
+        make_reviews(title, django_user_model, 2, 1)
+        data, _ = count_expand_queries(
+            client, f'/api/v1/titles/{title.pk}/?expand=reviews'
+        )
+        assert len(data['reviews']) == 2
+        assert 'comments' not in data['reviews'][0]
+
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert 'reviews' not in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalid_expand(self, client):
+        title = fill_titles(1)[0]
+        for query in ('expand=author', 'expand=reviews&reviews_limit=0',
+                      'expand=reviews&comments_limit=x'):
+            response = client.get(f'/api/v1/titles/{title.pk}/?{query}')
+            assert response.status_code == 400, (
+                f'Проверьте, что `?{query}` возвращает статус 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_expand_etag(self, client, django_user_model):
+        from reviews.models import Comment
+        title = fill_titles(1)[0]
+        review = make_reviews(title, django_user_model, 1, 1)[0]
+        url = f'/api/v1/titles/{title.pk}/?expand=reviews.comments'
+        etag = client.get(url)['ETag']
+        Comment.objects.create(
+            review=review, author=review.author, text='Новый'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет ETag произведения со '
+            'встроенными комментариями'
+        )
+        assert response.json()['reviews'][0]['comments'][0]['text'] == 'Новый'
@@ -0,0 +1,18 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class Test25ExplainQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_list_queries_use_indexes(self):
+        call_command('import_data', stdout=StringIO())
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        report = out.getvalue()
+        for name in ('titles', 'categories', 'genres', 'reviews', 'comments'):
+            assert f'\n{name}: ok' in report, (
+                f'Проверьте, что запрос списка `{name}` использует индексы:\n{report}'
+            )